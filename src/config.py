@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # CONFIG
@@ -50,21 +51,40 @@ RANGE_OPTIONS = {
 }
 DEFAULT_RANGE_KEY = "last180days"
 
+# Concurrent downloads when scraping every format/range (outside CI)
+FETCH_WORKERS = 4
+
 # Project root (one level above this src/ folder)
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Vendored JS/CSS (vis-network, tom-select, pyvis bindings) inlined into or shipped with the page
+LIB_DIR = BASE_DIR / "lib"
+
 # Outputs
 SITE_DIR = BASE_DIR / "site"
 OUT_ARCHETYPES_CSV = str(SITE_DIR / "data" / "archetypes.csv")
 OUT_MATCHUPS_CSV = str(SITE_DIR / "data" / "matchups.csv")
 OUT_HTML = str(SITE_DIR / "index.html")
 
+# Local caches (Parquet copies of the tables, parse memo). Kept outside SITE_DIR so they are
+# neither committed with the site data nor published with the Pages artifact.
+CACHE_DIR = BASE_DIR / ".cache"
+
 # Graph coverage / filtering
 MIN_MATCHES_EDGE = 1           # include more edges (can be noisy)
 EPS_TIE = 0.005                # tie threshold around 50% (+/- EPS)
 HIDE_ISOLATED_NODES = False    # set True to remove isolated nodes
 TOP_N_ARCHETYPES = 35          # keep only the top N most represented decks
-EMBED_ASSETS = True            # inline JS/CSS so the HTML works standalone
+# Link lib/ JS/CSS (copied next to the HTML) so browsers fetch them in parallel and cache them
+# across reloads; inlining them made every page load re-download several hundred KB of assets.
+# Set True only for offline single-file distribution.
+EMBED_ASSETS = False
+PRECOMPRESS_HTML = True        # also write .gz (and .br when brotli is installed) for index.html and linked lib/ assets
+# Linked mode only: embed just the default dataset and write the others to data/<format>/dataset_<range>.json,
+# fetched by the page the first time that format/range is selected (keeps the initial HTML small).
+# Browsers block fetch() on file://, so this is off unless the page is served over HTTP: the Pages
+# workflow sets MTG_LAZY_DATASETS=1; locally, preview with `python -m http.server -d site`.
+LAZY_DATASETS = os.environ.get("MTG_LAZY_DATASETS") in {"1", "true", "TRUE", "yes", "YES"}
 
 # Visual scaling
 NODE_SIZE_MIN = 6
@@ -2,8 +2,9 @@
 
 import math
 from pathlib import Path
-from typing import Dict, Tuple, List
+from typing import Tuple, List
 
+import numpy as np
 import pandas as pd
 import networkx as nx
 
@@ -66,9 +67,41 @@ def scale_power(
     return out_min + x * (out_max - out_min)
 
 
-def _hex_to_rgb(h: str) -> Tuple[int, int, int]:
-    h = h.lstrip("#")
-    return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
+def scale_sqrt_vec(
+    values: np.ndarray, vmin: float, vmax: float, out_min: float, out_max: float
+) -> np.ndarray:
+    """
+    Array version of scale_sqrt (same clamping and edge cases, one ufunc pass).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    a = math.sqrt(vmin) if vmin > 0 else 0.0
+    b = math.sqrt(vmax) if vmax > 0 else 1.0
+    if b == a:
+        x = np.zeros_like(values)
+    else:
+        with np.errstate(invalid="ignore"):
+            x = (np.sqrt(np.clip(values, vmin, vmax)) - a) / (b - a)
+    return np.where(values <= 0, out_min, out_min + x * (out_max - out_min))
+
+
+def scale_power_vec(
+    values: np.ndarray,
+    vmin: float,
+    vmax: float,
+    out_min: float,
+    out_max: float,
+    power: float = 2.8,
+) -> np.ndarray:
+    """
+    Array version of scale_power (same clamping and edge cases, one ufunc pass).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if vmax == vmin:
+        x = np.zeros_like(values)
+    else:
+        x = (np.clip(values, vmin, vmax) - vmin) / (vmax - vmin)  # 0..1
+    x = np.power(x, power)
+    return np.where(values <= 0, out_min, out_min + x * (out_max - out_min))
 
 
 def _rgb_to_hex(rgb: Tuple[int, int, int]) -> str:
@@ -88,223 +121,341 @@ def _lerp_rgb(c1: Tuple[int, int, int], c2: Tuple[int, int, int], t: float) -> T
     )
 
 
-def winrate_to_color(wr: float, k: float = 5.5, gamma: float = 0.55) -> str:
+_WR_K = 5.5
+_WR_GAMMA = 0.55
+
+# Scale end points: #FF0000 (0%), #FFFF00 (50%), #00FF00 (100%).
+_RED = (255, 0, 0)
+_YEL = (255, 255, 0)
+_GRN = (0, 255, 0)
+
+
+def _winrate_to_color_exact(wr: float, k: float = _WR_K, gamma: float = _WR_GAMMA) -> str:
     """
     Aggressive diverging scale (red <-> yellow <-> green) for dense mid-range data.
     """
     wr = clamp(wr, 0.0, 1.0)
 
-    red = _hex_to_rgb("#FF0000")
-    yel = _hex_to_rgb("#FFFF00")
-    grn = _hex_to_rgb("#00FF00")
-
     if wr >= 0.5:
         u = (wr - 0.5) / 0.5  # 0..1
         t = math.tanh(k * u)
         t = clamp(t, 0.0, 1.0)
         t = t ** gamma
-        rgb = _lerp_rgb(yel, grn, t)
+        rgb = _lerp_rgb(_YEL, _GRN, t)
     else:
         u = (0.5 - wr) / 0.5  # 0..1
         t = math.tanh(k * u)
         t = clamp(t, 0.0, 1.0)
         t = t ** gamma
-        rgb = _lerp_rgb(yel, red, t)
+        rgb = _lerp_rgb(_YEL, _RED, t)
 
     return _rgb_to_hex(rgb)
 
 
-def edge_winrate_color(wr: float) -> str:
-    return winrate_to_color(wr)
+# Default-scale colours precomputed every 0.1 percentage point (the resolution the UI shows).
+_WR_LUT_STEPS = 1000
+_WR_LUT = tuple(_winrate_to_color_exact(i / _WR_LUT_STEPS) for i in range(_WR_LUT_STEPS + 1))
+_WR_LUT_ARR = np.array(_WR_LUT, dtype=object)
 
 
-def node_winrate_color(wr: float) -> str:
+def winrate_to_color(wr: float, k: float = _WR_K, gamma: float = _WR_GAMMA) -> str:
     """
-    wr in 0..1. Same scale as edges/table: 0 red, 0.5 yellow, 1 green.
+    Winrate (0..1) to "#rrggbb". The default scale is served from a lookup table.
     """
-    return winrate_to_color(wr)
+    if k != _WR_K or gamma != _WR_GAMMA:
+        return _winrate_to_color_exact(wr, k, gamma)
+    return _WR_LUT[int(round(clamp(wr, 0.0, 1.0) * _WR_LUT_STEPS))]
 
 
-def compute_radial_positions(archetypes_df: pd.DataFrame) -> Dict[str, Tuple[float, float]]:
+def winrate_to_color_vec(wr: np.ndarray, k: float = _WR_K, gamma: float = _WR_GAMMA) -> np.ndarray:
+    """
+    Array version of winrate_to_color. Returns an object array of "#rrggbb" strings.
+    """
+    wr = np.clip(np.asarray(wr, dtype=np.float64), 0.0, 1.0)
+    if k == _WR_K and gamma == _WR_GAMMA:
+        return _WR_LUT_ARR[np.rint(wr * _WR_LUT_STEPS).astype(np.intp)]
+
+    upper = wr >= 0.5
+
+    u = np.where(upper, (wr - 0.5) / 0.5, (0.5 - wr) / 0.5)  # 0..1
+    t = np.clip(np.tanh(k * u), 0.0, 1.0) ** gamma
+
+    yel = np.array(_YEL, dtype=np.float64)
+    end = np.where(upper[:, None], np.array(_GRN, dtype=np.float64), np.array(_RED, dtype=np.float64))
+    rgb = np.round(yel + (end - yel) * t[:, None]).astype(np.int64)
+    packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+    return np.array([f"#{v:06x}" for v in packed.tolist()], dtype=object)
+
+
+def compute_radial_positions(archetypes_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
     """
     Rings by overall_matches (log scale). Bigger decks go to outer rings for separation.
+    Returns (ids, xy): archetype names and an (N, 2) array of their x/y coordinates.
     """
-    ordered = archetypes_df.sort_values("overall_matches", ascending=False).copy()
-    names = ordered["archetype"].tolist()
-    matches = ordered["overall_matches"].astype(float).tolist()
-
-    if not names:
-        return {}
-
-    vmin = max(1.0, min(matches))
-    vmax = max(vmin + 1.0, max(matches))
-
-    def norm_log(m: float) -> float:
-        a = math.log10(vmin)
-        b = math.log10(vmax)
-        if b == a:
-            return 0.0
-        return (math.log10(max(m, vmin)) - a) / (b - a)
-
-    ring_groups: Dict[int, List[str]] = {i: [] for i in range(RING_COUNT)}
-    for name, m in zip(names, matches):
-        t = norm_log(m)
-        ring_idx = int(round(t * (RING_COUNT - 1)))
-        ring_idx = int(clamp(ring_idx, 0, RING_COUNT - 1))
-        ring_groups[ring_idx].append(name)
-
-    positions: Dict[str, Tuple[float, float]] = {}
-    for ring_idx in range(RING_COUNT):
-        ring_nodes = ring_groups.get(ring_idx, [])
-        if not ring_nodes:
-            continue
-        radius = RING_RADIUS_BASE + ring_idx * RING_RADIUS_STEP
-        count = len(ring_nodes)
-        angle_offset = (ring_idx * math.pi) / max(1, RING_COUNT)
-        for i, node in enumerate(ring_nodes):
-            angle = angle_offset + (2.0 * math.pi * i / count)
-            x = math.cos(angle) * radius
-            y = math.sin(angle) * radius
-            positions[node] = (x, y)
-
-    return positions
+    ordered = archetypes_df.sort_values("overall_matches", ascending=False)
+    names = ordered["archetype"].to_numpy(dtype=object)
+    matches = ordered["overall_matches"].to_numpy(dtype=np.float64)
 
+    if names.size == 0:
+        return names, np.empty((0, 2), dtype=np.float64)
 
-def build_graph(archetypes_df: pd.DataFrame, matchups_df: pd.DataFrame) -> nx.DiGraph:
-    arch_sorted = archetypes_df.sort_values("overall_matches", ascending=False).copy()
-    if TOP_N_ARCHETYPES and TOP_N_ARCHETYPES > 0:
-        arch_sorted = arch_sorted.head(TOP_N_ARCHETYPES).copy()
+    vmin = max(1.0, float(matches.min()))
+    vmax = max(vmin + 1.0, float(matches.max()))
 
-    G = nx.DiGraph()
+    a = math.log10(vmin)
+    b = math.log10(vmax)
+    if b == a:
+        t = np.zeros_like(matches)
+    else:
+        t = (np.log10(np.maximum(matches, vmin)) - a) / (b - a)
+    ring_idx = np.clip(np.round(t * (RING_COUNT - 1)).astype(np.int64), 0, RING_COUNT - 1)
+
+    # Group by ring (stable, so each ring keeps the matches ordering) and place
+    # every node at its slot on the ring.
+    order = np.argsort(ring_idx, kind="stable")
+    ring_sorted = ring_idx[order]
+    counts = np.bincount(ring_idx, minlength=RING_COUNT)
+    starts = np.cumsum(counts) - counts
+    local_pos = np.arange(order.size) - starts[ring_sorted]
+
+    radius = RING_RADIUS_BASE + ring_sorted * RING_RADIUS_STEP
+    angle_offset = (ring_sorted * math.pi) / max(1, RING_COUNT)
+    angle = angle_offset + (2.0 * math.pi * local_pos / counts[ring_sorted])
+    x = np.cos(angle) * radius
+    y = np.sin(angle) * radius
+
+    return names[order], np.column_stack((x, y))
+
+
+NODE_COLUMNS = ["archetype", "size", "matches", "overall_winrate", "url", "title", "color"]
+EDGE_COLUMNS = [
+    "src",
+    "dst",
+    "matches",
+    "winrate",
+    "winrate_from",
+    "neutral",
+    "width",
+    "color",
+    "label",
+    "title",
+    "arrows",
+]
+
+
+def _edge_kernel(
+    matches_arr: np.ndarray, wr_arr: np.ndarray, m_min: float, m_max: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Numeric part of the edge build, on whole arrays:
+    widths, tie flags, winner-oriented winrates and colours.
+    """
+    widths = scale_power_vec(
+        matches_arr,
+        vmin=m_min,
+        vmax=m_max,
+        out_min=EDGE_WIDTH_MIN,
+        out_max=EDGE_WIDTH_MAX,
+        power=3.5,
+    )
+    neutral = np.abs(wr_arr - 0.5) <= EPS_TIE
+    wr_win = np.where(neutral, 0.5, np.where(wr_arr > 0.5, wr_arr, 1.0 - wr_arr))
+    return widths, neutral, wr_win, winrate_to_color_vec(wr_win)
 
-    vmin = max(1, int(arch_sorted["overall_matches"].min()))
-    vmax = max(vmin + 1, int(arch_sorted["overall_matches"].max()))
 
-    for _, r in arch_sorted.iterrows():
-        ms = int(r["overall_matches"])
-        size = scale_sqrt(ms, vmin, vmax, NODE_SIZE_MIN, NODE_SIZE_MAX)
+def _arrow_strings(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    """
+    Cast the given text columns to Arrow-backed strings (isin/== run as Arrow kernels).
+    Columns that are missing or already Arrow-backed are left alone.
+    """
+    todo = {
+        c: "string[pyarrow]"
+        for c in cols
+        if c in df.columns and getattr(df[c].dtype, "storage", None) != "pyarrow"
+    }
+    return df.astype(todo) if todo else df
+
 
-        url = r.get("url_relative")
-        full_url = (
-            f"https://mtgdecks.net{url}" if isinstance(url, str) and url.startswith("/") else None
-        )
+def build_graph_frames(
+    archetypes_df: pd.DataFrame, matchups_df: pd.DataFrame
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Column-oriented graph: one row per node (NODE_COLUMNS) and per directed edge
+    (EDGE_COLUMNS). Missing winrates/URLs are NaN here; build_graph turns them into None.
+    """
+    archetypes_df = _arrow_strings(archetypes_df, ["archetype", "url_relative"])
+    matchups_df = _arrow_strings(matchups_df, ["a", "b"])
 
-        ow = r["overall_winrate"]
-        title = (
-            f"{r['archetype']}\nOverall winrate: {ow:.3f}\nMatches: {ms:,}"
-            if pd.notna(ow)
-            else f"{r['archetype']}\nMatches: {ms:,}"
-        )
+    # Read-only from here on, so no defensive copies of the input frames.
+    arch_sorted = archetypes_df.sort_values("overall_matches", ascending=False, ignore_index=True)
+    if TOP_N_ARCHETYPES and TOP_N_ARCHETYPES > 0:
+        arch_sorted = arch_sorted.head(TOP_N_ARCHETYPES)
 
-        G.add_node(
-            r["archetype"],
-            size=float(size),
-            matches=ms,
-            overall_winrate=float(ow) if pd.notna(ow) else None,
-            url=full_url,
-            title=title,
-        )
+    vmin = max(1, int(arch_sorted["overall_matches"].min()))
+    vmax = max(vmin + 1, int(arch_sorted["overall_matches"].max()))
 
-    top_names = set(arch_sorted["archetype"].tolist())
-    m = matchups_df[
-        (matchups_df["matches"] >= MIN_MATCHES_EDGE)
-        & (matchups_df["a"].isin(top_names))
-        & (matchups_df["b"].isin(top_names))
-    ].copy()
+    names = arch_sorted["archetype"].tolist()
+    ms_arr = arch_sorted["overall_matches"].to_numpy(dtype=np.int64)
+    ow_arr = arch_sorted["overall_winrate"].to_numpy(dtype=np.float64)
+    if "url_relative" in arch_sorted:
+        url_list = arch_sorted["url_relative"].tolist()
+    else:
+        url_list = [None] * len(names)
+    sizes = scale_sqrt_vec(ms_arr, vmin, vmax, NODE_SIZE_MIN, NODE_SIZE_MAX)
+
+    url_s = pd.Series(url_list, dtype=object)
+    has_url = url_s.map(lambda u: isinstance(u, str) and u.startswith("/")).to_numpy(dtype=bool)
+    full_urls = np.where(has_url, "https://mtgdecks.net" + url_s.where(has_url, "").astype(object), None)
+
+    ow_nan = np.isnan(ow_arr)
+    name_s = pd.Series(names, dtype=object)
+    matches_txt = pd.Series(ms_arr).map("{:,}".format).astype(object)
+    ow_txt = pd.Series(ow_arr).map("{:.3f}".format).astype(object)
+    node_titles = np.where(
+        ow_nan,
+        name_s + "\nMatches: " + matches_txt,
+        name_s + "\nOverall winrate: " + ow_txt + "\nMatches: " + matches_txt,
+    )
+
+    # Node colours from the same LUT as edges; decks without a winrate get none.
+    node_colors = np.where(ow_nan, None, winrate_to_color_vec(np.where(ow_nan, 0.5, ow_arr)))
+
+    nodes_df = pd.DataFrame(
+        {
+            "archetype": names,
+            "size": sizes,
+            "matches": ms_arr,
+            "overall_winrate": ow_arr,
+            "url": full_urls,
+            "title": node_titles,
+            "color": node_colors,
+        },
+        columns=NODE_COLUMNS,
+    )
+
+    # One boolean buffer, narrowed in place: cheapest (numeric) test first.
+    top_names = arch_sorted["archetype"].unique()
+    mask = matchups_df["matches"].to_numpy() >= MIN_MATCHES_EDGE
+    mask &= matchups_df["a"].isin(top_names).to_numpy(dtype=bool)
+    mask &= matchups_df["b"].isin(top_names).to_numpy(dtype=bool)
+    m = matchups_df[mask]
 
     m_min = float(max(MIN_MATCHES_EDGE, int(m["matches"].min()))) if not m.empty else float(MIN_MATCHES_EDGE)
     m_max = float(int(m["matches"].max())) if not m.empty else float(MIN_MATCHES_EDGE)
     if m_max <= m_min:
         m_max = m_min + 1.0
 
-    seen_pairs = set()
-
-    for _, r in m.iterrows():
-        a, b = r["a"], r["b"]
-        if a == b:
-            continue
-
-        pair_key = tuple(sorted([a, b]))
-        if pair_key in seen_pairs:
-            continue
-        seen_pairs.add(pair_key)
-
-        ab = m[(m["a"] == a) & (m["b"] == b)]
-        ba = m[(m["a"] == b) & (m["b"] == a)]
-
-        if not ab.empty:
-            wr_ab = float(ab.iloc[0]["winrate_a_vs_b"])
-            matches = int(ab.iloc[0]["matches"])
-            ci_low = ab.iloc[0].get("ci_low")
-            ci_high = ab.iloc[0].get("ci_high")
-        elif not ba.empty:
-            wr_ab = 1.0 - float(ba.iloc[0]["winrate_a_vs_b"])
-            matches = int(ba.iloc[0]["matches"])
-            ci_low = ba.iloc[0].get("ci_low")
-            ci_high = ba.iloc[0].get("ci_high")
-        else:
-            continue
-
-        width = scale_power(
-            matches,
-            vmin=m_min,
-            vmax=m_max,
-            out_min=EDGE_WIDTH_MIN,
-            out_max=EDGE_WIDTH_MAX,
-            power=3.5,
-        )
-        neutral = abs(wr_ab - 0.5) <= EPS_TIE
-
-        if neutral:
-            label = f"{matches:,}"
-            title = f"{a} vs {b}\n~ 50%\nMatches: {matches:,}"
-            G.add_edge(
-                a,
-                b,
+    # One row per unordered pair, grouped on its canonical (lo, hi) names; the first
+    # occurrence (in table order) defines the orientation.
+    m = m[m["a"] != m["b"]]
+    a_arr = m["a"].to_numpy(dtype=object)
+    b_arr = m["b"].to_numpy(dtype=object)
+    oriented = a_arr < b_arr
+    pair_lo = np.where(oriented, a_arr, b_arr)
+    pair_hi = np.where(oriented, b_arr, a_arr)
+    pairs = m.groupby([pair_lo, pair_hi], sort=False).head(1)
+
+    a_arr = pairs["a"].to_numpy(dtype=object)
+    b_arr = pairs["b"].to_numpy(dtype=object)
+    wr_ab_arr = pairs["winrate_a_vs_b"].to_numpy(dtype=np.float64)
+    matches_arr = pairs["matches"].to_numpy(dtype=np.int64)
+    widths, neutral_arr, wr_win, edge_colors = _edge_kernel(matches_arr, wr_ab_arr, m_min, m_max)
+
+    # Ties keep the table orientation; otherwise the edge points from winner to loser.
+    keep_dir = neutral_arr | (wr_ab_arr > 0.5)
+    src_arr = np.where(keep_dir, a_arr, b_arr)
+    dst_arr = np.where(keep_dir, b_arr, a_arr)
+
+    nan_col = pd.Series(np.nan, index=pairs.index)
+    ci_low = pairs.get("ci_low", nan_col).to_numpy(dtype=np.float64)
+    ci_high = pairs.get("ci_high", nan_col).to_numpy(dtype=np.float64)
+
+    # Titles/labels are assembled column-wise; round(x, 1) and str() match Python's output.
+    src_s = pd.Series(src_arr, dtype=object)
+    dst_s = pd.Series(dst_arr, dtype=object)
+    labels = pd.Series(matches_arr).map("{:,}".format).astype(object)
+    pct_txt = pd.Series(wr_win * 100).round(1).astype(str).astype(object)
+    # CI text only for edges with both bounds; the rest get "".
+    has_ci = ~(np.isnan(ci_low) | np.isnan(ci_high))
+    ci_txt = np.full(len(pairs), "", dtype=object)
+    if has_ci.any():
+        ci_txt[has_ci] = (
+            "\nCI: "
+            + pd.Series(ci_low[has_ci] * 100).round(1).astype(str).astype(object)
+            + "% - "
+            + pd.Series(ci_high[has_ci] * 100).round(1).astype(str).astype(object)
+            + "%"
+        ).to_numpy()
+    edge_titles = np.where(
+        neutral_arr,
+        src_s + " vs " + dst_s + "\n~ 50%\nMatches: " + labels,
+        src_s + " -> " + dst_s + "\nWinrate: " + pct_txt + "%\nMatches: " + labels + ci_txt,
+    )
+
+    edges_df = pd.DataFrame(
+        {
+            "src": src_arr,
+            "dst": dst_arr,
+            "matches": matches_arr,
+            "winrate": np.where(neutral_arr, wr_ab_arr, wr_win),
+            "winrate_from": wr_win,
+            "neutral": neutral_arr,
+            "width": widths,
+            "color": edge_colors,
+            "label": labels.to_numpy(),
+            "title": edge_titles,
+            "arrows": np.where(neutral_arr, "", "to"),
+        },
+        columns=EDGE_COLUMNS,
+    )
+
+    if HIDE_ISOLATED_NODES:
+        linked = nodes_df["archetype"].isin(edges_df["src"]) | nodes_df["archetype"].isin(edges_df["dst"])
+        nodes_df = nodes_df[linked]
+
+    return nodes_df.reset_index(drop=True), edges_df
+
+
+def build_graph(archetypes_df: pd.DataFrame, matchups_df: pd.DataFrame) -> nx.DiGraph:
+    """
+    NetworkX view of build_graph_frames (node/edge attributes are the frame columns).
+    """
+    nodes_df, edges_df = build_graph_frames(archetypes_df, matchups_df)
+    isnan = math.isnan  # bound once for the per-node generator below
+
+    G = nx.DiGraph()
+    G.add_nodes_from(
+        (
+            name,
+            dict(
+                size=size,
                 matches=matches,
-                winrate=wr_ab,
-                winrate_from=0.5,
-                neutral=True,
-                width=float(width),
-                color=edge_winrate_color(0.5),
-                label=label,
+                overall_winrate=None if isnan(ow) else ow,
+                url=url if isinstance(url, str) else None,
                 title=title,
-                arrows="",
-            )
-        else:
-            if wr_ab > 0.5:
-                src, dst = a, b
-                wr = wr_ab
-            else:
-                src, dst = b, a
-                wr = 1.0 - wr_ab
-
-            color = edge_winrate_color(wr)
-            label = f"{matches:,}"
-            pct = round(wr * 100, 1)
-
-            ci_txt = ""
-            if pd.notna(ci_low) and pd.notna(ci_high):
-                ci_txt = f"\nCI: {round(ci_low*100,1)}% - {round(ci_high*100,1)}%"
-
-            title = f"{src} -> {dst}\nWinrate: {pct}%\nMatches: {matches:,}{ci_txt}"
-
-            G.add_edge(
-                src,
-                dst,
+                color=color if isinstance(color, str) else None,
+            ),
+        )
+        for name, size, matches, ow, url, title, color in zip(*(nodes_df[c].tolist() for c in NODE_COLUMNS))
+    )
+    G.add_edges_from(
+        (
+            src,
+            dst,
+            dict(
                 matches=matches,
-                winrate=wr,
-                winrate_from=wr,
-                neutral=False,
-                width=float(width),
+                winrate=winrate,
+                winrate_from=winrate_from,
+                neutral=neutral,
+                width=width,
                 color=color,
                 label=label,
                 title=title,
-                arrows="to",
-            )
-
-    if HIDE_ISOLATED_NODES:
-        isolated = [n for n in G.nodes() if G.degree(n) == 0]
-        G.remove_nodes_from(isolated)
-
+                arrows=arrows,
+            ),
+        )
+        for src, dst, matches, winrate, winrate_from, neutral, width, color, label, title, arrows in zip(
+            *(edges_df[c].tolist() for c in EDGE_COLUMNS)
+        )
+    )
     return G
@@ -1,22 +1,35 @@
 from __future__ import annotations
 
+import hashlib
 import os
+import pickle
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 import pandas as pd
 import networkx as nx
+import pyarrow as pa
+from pyarrow import csv as pacsv
 
 from config import (
+    CACHE_DIR,
     DEFAULT_FORMAT_KEY,
     DEFAULT_RANGE_KEY,
+    FETCH_WORKERS,
     FORMATS,
+    LAZY_DATASETS,
     OUT_HTML,
     RANGE_OPTIONS,
 )
 from graph_build import build_graph
 from render_html import render_pyvis
-from scrape import build_range_url, fetch_html, parse_page
+from scrape import PARSE_CACHE_VERSION, build_range_url, fetch_html, parse_page
+
+
+# Columns read back from the cache (the only ones build_graph / rendering use).
+ARCHETYPE_CACHE_COLUMNS = ["archetype", "overall_winrate", "overall_matches", "url_relative"]
+MATCHUP_CACHE_COLUMNS = ["a", "b", "winrate_a_vs_b", "matches", "ci_low", "ci_high"]
 
 
 def inspect_console(archetypes_df, matchups_df, G) -> None:
@@ -52,6 +65,127 @@ def _range_csv_paths(format_key: str, range_key: str) -> Tuple[Path, Path]:
     )
 
 
+def _parquet_path(csv_path: Path) -> Path:
+    """
+    Parquet copy of a cached CSV: same relative path, mirrored under CACHE_DIR.
+    """
+    return CACHE_DIR / csv_path.relative_to(Path(OUT_HTML).parent).with_suffix(".parquet")
+
+
+def _prefetch_html(
+    format_items: List[Tuple[str, Dict]],
+    range_items: List[Tuple[str, Dict]],
+) -> Dict[Tuple[str, str], Future]:
+    """
+    Start every format/range download up front so network latency overlaps;
+    callers pick the results up in order with .result().
+    """
+    executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+    futures: Dict[Tuple[str, str], Future] = {}
+    for format_key, format_meta in format_items:
+        base_url = format_meta.get("base_url", "")
+        for range_key, range_meta in range_items:
+            url = _build_range_url(base_url, range_meta.get("path", ""))
+            futures[(format_key, range_key)] = executor.submit(fetch_html, url, base_url=base_url)
+    # Let the queued downloads finish in the background; results are read via the futures.
+    executor.shutdown(wait=False)
+    return futures
+
+
+def _write_csv(df: pd.DataFrame, path: Path) -> None:
+    """
+    df.to_csv(path, index=False) through Arrow's C++ writer, byte-for-byte: values are written
+    unquoted and floats pre-formatted the way pandas writes them (repr, so 1.0 stays "1.0"),
+    which keeps the tracked CSVs stable. Text containing separators/quotes falls back to pandas.
+    """
+    text_cols = df.select_dtypes(include=["object", "string"]).columns
+    needs_quoting = any(
+        df[col].astype("string").str.contains(r'[,"\r\n]', regex=True, na=False).any() for col in text_cols
+    )
+    if needs_quoting:
+        df.to_csv(path, index=False)
+        return
+
+    float_cols = df.select_dtypes(include="floating").columns
+    if len(float_cols):
+        df = df.assign(**{col: df[col].map(repr, na_action="ignore") for col in float_cols})
+
+    with pa.OSFile(str(path), "wb") as sink:
+        sink.write((",".join(map(str, df.columns)) + "\n").encode("utf-8"))
+        pacsv.write_csv(
+            pa.Table.from_pandas(df, preserve_index=False),
+            sink,
+            write_options=pacsv.WriteOptions(include_header=False, quoting_style="none"),
+        )
+
+
+def _save_cache(
+    archetypes_df: pd.DataFrame, matchups_df: pd.DataFrame, out_arch: Path, out_match: Path
+) -> None:
+    # Parquet is the fast cache; the CSVs stay as the human-readable copy.
+    _write_csv(archetypes_df, out_arch)
+    _write_csv(matchups_df, out_match)
+    for df, csv_path in ((archetypes_df, out_arch), (matchups_df, out_match)):
+        pq_path = _parquet_path(csv_path)
+        pq_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(pq_path, compression="snappy", index=False)
+
+
+def _load_cache(out_arch: Path, out_match: Path) -> Tuple[pd.DataFrame, pd.DataFrame, Path, Path]:
+    """
+    Load cached archetypes/matchups, preferring the Parquet copies unless a CSV is newer
+    (e.g. updated by a pull). Raises FileNotFoundError when neither is available.
+    """
+    arch_pq = _parquet_path(out_arch)
+    match_pq = _parquet_path(out_match)
+    if _is_fresh(arch_pq, out_arch) and _is_fresh(match_pq, out_match):
+        return (
+            pd.read_parquet(arch_pq, columns=ARCHETYPE_CACHE_COLUMNS),
+            pd.read_parquet(match_pq, columns=MATCHUP_CACHE_COLUMNS),
+            arch_pq,
+            match_pq,
+        )
+    return (
+        pd.read_csv(out_arch, usecols=ARCHETYPE_CACHE_COLUMNS),
+        pd.read_csv(out_match, usecols=MATCHUP_CACHE_COLUMNS),
+        out_arch,
+        out_match,
+    )
+
+
+def _is_fresh(pq_path: Path, csv_path: Path) -> bool:
+    if not pq_path.exists():
+        return False
+    return not csv_path.exists() or pq_path.stat().st_mtime >= csv_path.stat().st_mtime
+
+
+def _parse_page_cached(html: str, out_arch: Path, range_key: str) -> Tuple[pd.DataFrame, pd.DataFrame, bool]:
+    """
+    parse_page memoized on the SHA-256 of the HTML: an unchanged page is loaded from
+    _parsed_<range>_<version>_<hash>.pkl in the CACHE_DIR mirror of the CSVs' folder, where
+    <version> is scrape.PARSE_CACHE_VERSION. Older pickles for the range are removed.
+    Returns (archetypes_df, matchups_df, cache_hit).
+    """
+    digest = hashlib.sha256(html.encode("utf-8")).hexdigest()[:16]
+    cache_dir = _parquet_path(out_arch).parent
+    pkl_path = cache_dir / f"_parsed_{range_key}_v{PARSE_CACHE_VERSION}_{digest}.pkl"
+    if pkl_path.exists():
+        try:
+            with pkl_path.open("rb") as fh:
+                archetypes_df, matchups_df = pickle.load(fh)
+            return archetypes_df, matchups_df, True
+        except Exception as exc:
+            print(f"[WARN] Unreadable parse cache {pkl_path}: {exc}")
+
+    archetypes_df, matchups_df = parse_page(html)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for stale in cache_dir.glob(f"_parsed_{range_key}_*.pkl"):
+        stale.unlink(missing_ok=True)
+    with pkl_path.open("wb") as fh:
+        pickle.dump((archetypes_df, matchups_df), fh, protocol=pickle.HIGHEST_PROTOCOL)
+    return archetypes_df, matchups_df, False
+
+
 def main() -> None:
     graphs_by_format: Dict[str, Dict[str, Tuple[nx.DiGraph, pd.DataFrame]]] = {}
 
@@ -63,6 +197,9 @@ def main() -> None:
             "[CI] GITHUB_ACTIONS detected. Scraping only the default "
             f"format/range ({DEFAULT_FORMAT_KEY}/{DEFAULT_RANGE_KEY}) and using cached CSVs for the rest."
         )
+        prefetched: Dict[Tuple[str, str], Future] = {}
+    else:
+        prefetched = _prefetch_html(format_items, range_items)
 
     for format_key, format_meta in format_items:
         format_label = format_meta.get("label", format_key)
@@ -81,6 +218,8 @@ def main() -> None:
                     f"[CI] Cache-only mode for {format_key}/{range_key}. Skipping network fetch."
                 )
                 html = None
+            elif (format_key, range_key) in prefetched:
+                html = prefetched[(format_key, range_key)].result()
             else:
                 html = fetch_html(url, base_url=base_url)
 
@@ -88,18 +227,19 @@ def main() -> None:
             if html is None:
                 print(f"[WARN] Fetch failed for {format_key}/{range_key}. Trying cached CSVs...")
                 try:
-                    archetypes_df = pd.read_csv(out_arch)
-                    matchups_df = pd.read_csv(out_match)
-                    print(f"[CACHE] Loaded: {out_arch}, {out_match}")
+                    archetypes_df, matchups_df, src_arch, src_match = _load_cache(out_arch, out_match)
+                    print(f"[CACHE] Loaded: {src_arch}, {src_match}")
                 except FileNotFoundError:
                     print(f"[SKIP] No cached CSVs for {format_key}/{range_key}. Skipping.")
                     continue
             else:
                 print(f"HTML downloaded: {len(html):,} chars")
-                archetypes_df, matchups_df = parse_page(html)
-                archetypes_df.to_csv(out_arch, index=False)
-                matchups_df.to_csv(out_match, index=False)
-                print(f"Saved: {out_arch}, {out_match}")
+                archetypes_df, matchups_df, cache_hit = _parse_page_cached(html, out_arch, range_key)
+                if cache_hit and _is_fresh(_parquet_path(out_arch), out_arch) and _is_fresh(_parquet_path(out_match), out_match):
+                    print("[CACHE] Page unchanged since last parse; reusing cached tables.")
+                else:
+                    _save_cache(archetypes_df, matchups_df, out_arch, out_match)
+                    print(f"Saved: {out_arch}, {out_match} (+ .parquet in {CACHE_DIR})")
 
             G = build_graph(archetypes_df, matchups_df)
             inspect_console(archetypes_df, matchups_df, G)
@@ -130,7 +270,11 @@ def main() -> None:
         default_range_key=default_range_key,
     )
     print(f"\nOK: generated HTML -> {OUT_HTML}")
-    print("Open it in the browser (double click).")
+    if LAZY_DATASETS:
+        # The other formats/ranges are fetched from data/, which browsers block on file://.
+        print(f"Serve it over HTTP to browse it: python -m http.server -d {Path(OUT_HTML).parent}")
+    else:
+        print("Open it in the browser (double click).")
 
 
 if __name__ == "__main__":
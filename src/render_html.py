@@ -1,7 +1,12 @@
 ﻿from __future__ import annotations
 
+import gzip
 import json
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Tuple, Any, List
 
@@ -9,287 +14,29 @@ import pandas as pd
 import networkx as nx
 from pyvis.network import Network
 
-from graph_build import compute_radial_positions, node_winrate_color
-from config import EMBED_ASSETS, FORMATS, RANGE_OPTIONS
+from graph_build import compute_radial_positions
+from config import EMBED_ASSETS, FORMATS, LAZY_DATASETS, LIB_DIR, PRECOMPRESS_HTML, RANGE_OPTIONS
 
+try:
+    import brotli
+except ImportError:  # optional: only used for the .br sidecar
+    brotli = None
 
-def _apply_visual_overrides(net: Network, G: nx.DiGraph, archetypes_df: pd.DataFrame) -> None:
-    positions = compute_radial_positions(archetypes_df)
+try:
+    import orjson
+except ImportError:  # optional: faster serializer for the datasets payload
+    orjson = None
 
-    for n in net.nodes:
-        node_id = n["id"]
-        attrs = G.nodes[node_id]
 
-        size_val = float(attrs.get("size", 25))
-        matches_val = int(attrs.get("matches", 0))
-        ow = attrs.get("overall_winrate")
-
-        wr_txt = f"{ow * 100:.1f}%" if isinstance(ow, float) else "n/a"
-        label = f"Winrate: {wr_txt}\nMatches: {matches_val:,}"
-        # Keep text inside large nodes and readable inside small ones.
-        font_size = max(8, min(18, size_val * 0.33))
-
-        n["size"] = size_val
-        n["display_label"] = node_id
-        n["label"] = label
-        n["title"] = attrs.get("title", node_id)
-        n["shape"] = "circle"
-        n["font"] = {
-            "color": "#ffffff",
-            "size": font_size,
-            "strokeWidth": 3,
-            "strokeColor": "#101010",
-            "align": "center",
-            "vadjust": 0,
-        }
-        n["matches"] = matches_val
-        n["overall_winrate"] = float(ow) if isinstance(ow, float) else None
-
-        if isinstance(ow, float):
-            n["color"] = node_winrate_color(ow)
-
-        if attrs.get("url"):
-            n["url"] = attrs["url"]
-
-        if node_id in positions:
-            x, y = positions[node_id]
-            n["x"] = x
-            n["y"] = y
-            n["fixed"] = True
-
-    for e in net.edges:
-        src = e["from"]
-        dst = e["to"]
-        attrs = G.edges[(src, dst)]
-        e["width"] = float(attrs.get("width", 2))
-        e["color"] = attrs.get("color", "#888888")
-        e["label"] = ""
-        e["title"] = attrs.get("title", "")
-        e["matches"] = int(attrs.get("matches", 0))
-        e["winrate"] = float(attrs.get("winrate", 0.5))
-        e["winrate_from"] = float(attrs.get("winrate_from", attrs.get("winrate", 0.5)))
-        e["neutral"] = bool(attrs.get("neutral", False))
-        arrows = attrs.get("arrows", "to")
-        e["arrows"] = arrows
-
-        if attrs.get("neutral", False):
-            e["arrows"] = {"to": {"enabled": False}}
-
-
-def _build_dataset(G: nx.DiGraph, archetypes_df: pd.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
-    positions = compute_radial_positions(archetypes_df)
-
-    nodes: List[Dict[str, Any]] = []
-    label_nodes: List[Dict[str, Any]] = []
-    for node_id, attrs in G.nodes(data=True):
-        size_val = float(attrs.get("size", 25))
-        matches_val = int(attrs.get("matches", 0))
-        ow = attrs.get("overall_winrate")
-        wr_txt = f"{ow * 100:.1f}%" if isinstance(ow, float) else "n/a"
-        label = f"Winrate: {wr_txt}\nMatches: {matches_val:,}"
-        font_size = max(8, min(18, size_val * 0.33))
-
-        node: Dict[str, Any] = {
-            "id": node_id,
-            "display_label": node_id,
-            "label": label,
-            "size": size_val,
-            "title": attrs.get("title", node_id),
-            "shape": "circle",
-            "font": {
-                "color": "#ffffff",
-                "size": font_size,
-                "strokeWidth": 3,
-                "strokeColor": "#101010",
-                "align": "center",
-                "vadjust": 0,
-            },
-            "matches": matches_val,
-            "overall_winrate": float(ow) if isinstance(ow, float) else None,
-        }
-
-        if isinstance(ow, float):
-            node["color"] = node_winrate_color(ow)
-
-        if attrs.get("url"):
-            node["url"] = attrs["url"]
-
-        if node_id in positions:
-            x, y = positions[node_id]
-            node["x"] = x
-            node["y"] = y
-            node["fixed"] = True
-
-            # External label node (archetype name) with uniform size.
-            label_nodes.append(
-                {
-                    "id": f"label::{node_id}",
-                    "base_id": node_id,
-                    "is_label_node": True,
-                    "label": node_id,
-                    "shape": "text",
-                    "physics": False,
-                    "x": x,
-                    "y": y - (size_val * 1.15 + 28),
-                    "fixed": True,
-                    "font": {
-                        "color": "#ffffff",
-                        "size": 16,
-                        "strokeWidth": 3,
-                        "strokeColor": "#101010",
-                        "align": "center",
-                        "vadjust": 0,
-                    },
-                }
-            )
-
-        nodes.append(node)
-
-    edges: List[Dict[str, Any]] = []
-    for idx, (src, dst, attrs) in enumerate(G.edges(data=True)):
-        edge: Dict[str, Any] = {
-            "id": f"e{idx}_{src}__{dst}",
-            "from": src,
-            "to": dst,
-            "width": float(attrs.get("width", 2)),
-            "color": attrs.get("color", "#888888"),
-            "label": "",
-            "title": attrs.get("title", ""),
-            "matches": int(attrs.get("matches", 0)),
-            "winrate": float(attrs.get("winrate", 0.5)),
-            "winrate_from": float(attrs.get("winrate_from", attrs.get("winrate", 0.5))),
-            "neutral": bool(attrs.get("neutral", False)),
-            "arrows": attrs.get("arrows", "to"),
-        }
-
-        if edge["neutral"]:
-            edge["arrows"] = {"to": {"enabled": False}}
-
-        edges.append(edge)
-
-    return {"nodes": nodes + label_nodes, "edges": edges}
-
-
-def render_pyvis(
-    graphs_by_format: Dict[str, Dict[str, Tuple[nx.DiGraph, pd.DataFrame]]],
-    out_html: str,
-    default_format_key: str,
-    default_range_key: str,
-) -> None:
-    if default_format_key not in graphs_by_format:
-        raise KeyError(f"default_format_key '{default_format_key}' not found in graphs_by_format")
-    if default_range_key not in graphs_by_format[default_format_key]:
-        raise KeyError(
-            f"default_range_key '{default_range_key}' not found in graphs_by_format[{default_format_key!r}]"
-        )
-
-    default_G, default_df = graphs_by_format[default_format_key][default_range_key]
-
-    net = Network(height="800px", width="100%", directed=True, bgcolor="#1f1f1f", font_color="#e6e6e6")
-    net.from_nx(default_G)
-    _apply_visual_overrides(net, default_G, default_df)
-
-    net.set_options(
-        """
-    var options = {
-      "interaction": {
-        "hover": true,
-        "multiselect": true,
-        "navigationButtons": false,
-        "zoomView": true,
-        "dragView": true
-      },
-      "physics": { "enabled": false },
-      "nodes": { "shape": "dot" },
-      "edges": {
-        "smooth": { "type": "dynamic" },
-        "font": { "align": "top" }
-      }
-    }
-    """)
-
-    net.write_html(out_html, open_browser=False, notebook=False)
-
-    datasets_by_format: Dict[str, Dict[str, Any]] = {}
-    for format_key, ranges_dict in graphs_by_format.items():
-        format_meta = FORMATS.get(format_key, {})
-        ranges_payload: Dict[str, Dict[str, Any]] = {}
-        for range_key, (G, df) in ranges_dict.items():
-            range_meta = RANGE_OPTIONS.get(range_key, {})
-            ranges_payload[range_key] = {
-                "key": range_key,
-                "label": range_meta.get("label", range_key),
-                **_build_dataset(G, df),
-            }
-
-        if not ranges_payload:
-            continue
-
-        datasets_by_format[format_key] = {
-            "key": format_key,
-            "label": format_meta.get("label", format_key),
-            "ranges": ranges_payload,
-        }
-
-    inject_filter_ui(
-        out_html,
-        datasets_by_format=datasets_by_format,
-        default_format_key=default_format_key,
-        default_range_key=default_range_key,
-    )
-    if EMBED_ASSETS:
-        inline_assets(out_html)
-
-
-def inject_filter_ui(
-    out_html: str,
-    datasets_by_format: Dict[str, Dict[str, Any]],
-    default_format_key: str,
-    default_range_key: str,
-) -> None:
-    html_path = Path(out_html)
-    html = html_path.read_text(encoding="utf-8")
-
-    if "matchupBody" in html:
-        return
-
-    if default_format_key not in datasets_by_format:
-        raise KeyError(f"default_format_key '{default_format_key}' not found in datasets_by_format")
-    if default_range_key not in datasets_by_format[default_format_key].get("ranges", {}):
-        raise KeyError(
-            f"default_range_key '{default_range_key}' not found in datasets_by_format[{default_format_key!r}]['ranges']"
-        )
-
-    updated_at_utc = datetime.now(timezone.utc).strftime("%B %d, %Y at %H:%M UTC")
-    datasets_json = json.dumps(datasets_by_format, ensure_ascii=True)
-
-    format_options_html_parts: List[str] = []
-    for key in FORMATS.keys():
-        if key not in datasets_by_format:
-            continue
-        label = datasets_by_format[key].get("label", key)
-        selected = " selected" if key == default_format_key else ""
-        format_options_html_parts.append(f'<option value="{key}"{selected}>{label}</option>')
-    format_options_html = "\n                    ".join(format_options_html_parts)
-
-    default_ranges = datasets_by_format[default_format_key].get("ranges", {})
-    range_options_html_parts: List[str] = []
-    for key in RANGE_OPTIONS.keys():
-        if key not in default_ranges:
-            continue
-        label = default_ranges[key].get("label", key)
-        selected = " selected" if key == default_range_key else ""
-        range_options_html_parts.append(f'<option value="{key}"{selected}>{label}</option>')
-    range_options_html = "\n                    ".join(range_options_html_parts)
-
-    extra_head = """
+# Static page fragments injected around pyvis's template; built once at import time.
+_EXTRA_HEAD = """
         <link rel="stylesheet" href="lib/vis-9.1.2/vis-network.css" />
         <script src="lib/vis-9.1.2/vis-network.min.js"></script>
         <link rel="stylesheet" href="lib/tom-select/tom-select.css" />
         <script src="lib/tom-select/tom-select.complete.min.js"></script>
     """
 
-    extra_css = """
+_EXTRA_CSS = """
 
              body {
                  background: #1b1b1b;
@@ -473,15 +220,16 @@ def inject_filter_ui(
              }
     """
 
-    controls_html = f"""
+# str.format templates: only the option lists, timestamp and default keys vary per render.
+_CONTROLS_HTML = """
             <div class="graph-controls">
                 <label for="formatFilter">Format</label>
                 <select id="formatFilter">
-                    {format_options_html}
+                    {format_options}
                 </select>
                 <label for="rangeFilter">Time range</label>
                 <select id="rangeFilter">
-                    {range_options_html}
+                    {range_options}
                 </select>
                 <label for="archetypeFilter">Archetype filter</label>
                 <select id="archetypeFilter" placeholder="All">
@@ -515,7 +263,24 @@ def inject_filter_ui(
             </div>
     """
 
-    sidepanel_html = """
+_FOOTER_HTML = """
+            <div class="graph-footer">
+                <span>Data source: <a href="https://mtgdecks.net/" target="_blank" rel="noopener noreferrer">mtgdecks.net</a></span>
+                <span>Last updated: {updated_at}</span>
+            </div>
+    """
+
+_EXTRA_JS_HEAD = (
+    "                  var datasetsByFormat = JSON.parse(document.getElementById('datasetsData').textContent);\n"
+    "                  var defaultFormatKey = '{default_format_key}';\n"
+    "                  var defaultRangeKey = '{default_range_key}';\n"
+    "                  var currentFormatKey = defaultFormatKey;\n"
+    "                  var currentRangeKey = defaultRangeKey;\n"
+    "                  var formatSelect = document.getElementById('formatFilter');\n"
+    "                  var rangeSelect = document.getElementById('rangeFilter');\n"
+)
+
+_SIDEPANEL_HTML = """
             <div class="graph-layout">
                 <div id="mynetwork" class="card-body"></div>
                 <div class="sidepanel">
@@ -535,22 +300,7 @@ def inject_filter_ui(
             </div>
     """
 
-    footer_html = f"""
-            <div class="graph-footer">
-                <span>Data source: <a href="https://mtgdecks.net/" target="_blank" rel="noopener noreferrer">mtgdecks.net</a></span>
-                <span>Last updated: {updated_at_utc}</span>
-            </div>
-    """
-
-    extra_js = (
-        f"                  var datasetsByFormat = {datasets_json};\n"
-        f"                  var defaultFormatKey = '{default_format_key}';\n"
-        f"                  var defaultRangeKey = '{default_range_key}';\n"
-        "                  var currentFormatKey = defaultFormatKey;\n"
-        "                  var currentRangeKey = defaultRangeKey;\n"
-        "                  var formatSelect = document.getElementById('formatFilter');\n"
-        "                  var rangeSelect = document.getElementById('rangeFilter');\n"
-        """
+_EXTRA_JS = """
                   var filterSelect = document.getElementById('archetypeFilter');
                   var resetBtn = document.getElementById('resetFilter');
                   var matrixBtn = document.getElementById('matrixBtn');
@@ -571,13 +321,21 @@ def inject_filter_ui(
                   var baseNodeState = {};
                   var baseEdgeState = {};
                   var baseSizes = {};
-
+                  var baseNodeEdges = {};
+                  var baseNodeNeighbors = {};
+                  var baseEdgeByPair = {};
+                  var baseReady = false;
+                  // 'all' once the base view has been restored, 'focused:<id>' after a selection,
+                  // null right after a dataset load.
+                  var viewState = null;
+
+                  // Filtered inside the DataSet, so only the matching nodes are copied out.
                   function visibleDataNodes() {
-                      return nodes.get().filter(function(n) { return !n.is_label_node; });
+                      return nodes.get({ filter: function(n) { return !n.is_label_node; } });
                   }
 
                   function allLabelNodes() {
-                      return nodes.get().filter(function(n) { return n.is_label_node; });
+                      return nodes.get({ filter: function(n) { return n.is_label_node; } });
                   }
 
                   function clearNodeSummary() {
@@ -614,8 +372,7 @@ def inject_filter_ui(
                       }
                   }
 
-                  function winrateColor(wr) {
-                      var x = Math.max(0, Math.min(1, wr));
+                  function winrateColorExact(x) {
                       var k = 8.5;
                       var gamma = 0.45;
 
@@ -644,6 +401,18 @@ def inject_filter_ui(
                       return 'rgb(' + r + ',' + g + ',' + b + ')';
                   }
 
+                  // Colours precomputed every 0.1 percentage point (the resolution the UI shows).
+                  var WR_LUT_STEPS = 1000;
+                  var WR_LUT = new Array(WR_LUT_STEPS + 1);
+                  for (var lutIdx = 0; lutIdx <= WR_LUT_STEPS; lutIdx++) {
+                      WR_LUT[lutIdx] = winrateColorExact(lutIdx / WR_LUT_STEPS);
+                  }
+
+                  function winrateColor(wr) {
+                      var x = Math.max(0, Math.min(1, wr));
+                      return WR_LUT[Math.round(x * WR_LUT_STEPS)];
+                  }
+
                   function edgeWidthScale(matches, minM, maxM) {
                       var OUT_MIN = 0.6;
                       var OUT_MAX = 10.0;
@@ -657,71 +426,96 @@ def inject_filter_ui(
                       return OUT_MIN + x * (OUT_MAX - OUT_MIN);
                   }
 
+                  // Only fields whose value actually changes are sent to the DataSets, so a
+                  // view switch makes vis re-process the items it touches, not every item.
+                  function patchFor(item, want) {
+                      var patch = null;
+                      for (var key in want) {
+                          var cur = item[key];
+                          var next = want[key];
+                          if (cur === next) continue;
+                          if (cur && next && typeof cur === 'object' && typeof next === 'object'
+                              && JSON.stringify(cur) === JSON.stringify(next)) continue;
+                          if (!patch) patch = { id: item.id };
+                          patch[key] = next;
+                      }
+                      return patch;
+                  }
+
                   function showAll() {
+                      finishStartup();
+                      restoreBaseView();
+                      network.setOptions({ physics: { enabled: false } });
+                      network.fit({ animation: false });
+                      panelTitle.textContent = 'Select an archetype';
+                      panelSubtitle.textContent = 'Matchups will be shown (click headers to sort).';
+                      matchupBody.innerHTML = '';
+                      clearNodeSummary();
+                  }
+
+                  function restoreBaseView() {
+                      // Nothing to diff when the base view is already showing (e.g. Reset twice).
+                      if (viewState === 'all') return;
+                      viewState = 'all';
                       var nodesArray = nodes.get();
                       var edgesArray = edges.get();
-                      var dataNodeIds = {};
                       var basePos = {};
-                      for (var i0 = 0; i0 < nodesArray.length; i0++) {
-                          var nn0 = nodesArray[i0];
-                          if (!nn0.is_label_node) {
-                              dataNodeIds[nn0.id] = true;
-                          }
-                      }
+                      var nodePatches = [];
+                      var edgePatches = [];
+                      var patch;
                       for (var i = 0; i < nodesArray.length; i++) {
                           var n0 = nodesArray[i];
-                          if (n0.is_label_node) {
-                              n0.hidden = !dataNodeIds[n0.base_id];
-                              continue;
-                          }
-                          n0.hidden = false;
+                          if (n0.is_label_node) continue;
+                          var want = { hidden: false };
                           var original = baseNodeState[n0.id];
                           if (original) {
-                              n0.fixed = original.fixed;
-                              n0.x = original.x;
-                              n0.y = original.y;
+                              want.fixed = original.fixed;
+                              want.x = original.x;
+                              want.y = original.y;
                           }
-                          basePos[n0.id] = { x: n0.x || 0, y: n0.y || 0 };
+                          patch = patchFor(n0, want);
+                          if (patch) nodePatches.push(patch);
+                          basePos[n0.id] = {
+                              x: (original ? original.x : n0.x) || 0,
+                              y: (original ? original.y : n0.y) || 0
+                          };
                       }
                       for (var i2 = 0; i2 < nodesArray.length; i2++) {
                           var lbl = nodesArray[i2];
                           if (!lbl.is_label_node) continue;
                           var bp = basePos[lbl.base_id];
-                          lbl.hidden = !bp;
+                          var wantLbl = { hidden: !bp };
                           if (bp) {
                               var off = ((baseSizes[lbl.base_id] || 20) * 1.2 + 28);
-                              lbl.x = bp.x;
-                              lbl.y = bp.y - off;
-                              lbl.fixed = true;
+                              wantLbl.x = bp.x;
+                              wantLbl.y = bp.y - off;
+                              wantLbl.fixed = true;
                           }
+                          patch = patchFor(lbl, wantLbl);
+                          if (patch) nodePatches.push(patch);
                       }
                       for (var j = 0; j < edgesArray.length; j++) {
-                          edgesArray[j].hidden = false;
+                          var wantEdge = { hidden: false };
                           var ebase = baseEdgeState[edgesArray[j].id];
                           if (ebase) {
-                              edgesArray[j].from = ebase.from;
-                              edgesArray[j].to = ebase.to;
-                              edgesArray[j].color = ebase.color;
-                              edgesArray[j].arrows = ebase.arrows;
-                              edgesArray[j].width = ebase.width;
+                              wantEdge.from = ebase.from;
+                              wantEdge.to = ebase.to;
+                              wantEdge.color = ebase.color;
+                              wantEdge.arrows = ebase.arrows;
+                              wantEdge.width = ebase.width;
                           }
+                          patch = patchFor(edgesArray[j], wantEdge);
+                          if (patch) edgePatches.push(patch);
                       }
-                      nodes.update(nodesArray);
-                      edges.update(edgesArray);
-                      network.setOptions({
-                          physics: { enabled: false },
-                          edges: { smooth: { type: "dynamic" } }
-                      });
-                      network.fit({ animation: false });
-                      panelTitle.textContent = 'Select an archetype';
-                      panelSubtitle.textContent = 'Matchups will be shown (click headers to sort).';
-                      matchupBody.innerHTML = '';
-                      clearNodeSummary();
+                      if (nodePatches.length) nodes.update(nodePatches);
+                      if (edgePatches.length) edges.update(edgePatches);
                   }
 
                   function showRelations(nodeId) {
-                      var connectedNodes = network.getConnectedNodes(nodeId);
-                      var connectedEdges = network.getConnectedEdges(nodeId);
+                      finishStartup();
+                      viewState = 'focused:' + nodeId;
+                      var connectedNodes = baseNodeNeighbors[nodeId] || [];
+                      var connectedEdges = baseNodeEdges[nodeId] || [];
                       var nodesArray = nodes.get();
                       var edgesArray = edges.get();
                       var keepIds = {};
@@ -729,44 +523,74 @@ def inject_filter_ui(
                       for (var ci = 0; ci < connectedNodes.length; ci++) {
                           keepIds[connectedNodes[ci]] = true;
                       }
+                      var keepEdgeIds = {};
+                      for (var ce = 0; ce < connectedEdges.length; ce++) {
+                          keepEdgeIds[connectedEdges[ce]] = true;
+                      }
 
+                      var nodePatches = [];
+                      var edgePatches = [];
                       for (var i = 0; i < nodesArray.length; i++) {
                           var n1 = nodesArray[i];
-                          if (n1.is_label_node) {
-                              n1.hidden = !keepIds[n1.base_id];
-                              continue;
+                          var hideNode = n1.is_label_node ? !keepIds[n1.base_id] : !keepIds[n1.id];
+                          if (!!n1.hidden !== hideNode) {
+                              nodePatches.push({ id: n1.id, hidden: hideNode });
                           }
-                          var keepNode = !!keepIds[n1.id];
-                          n1.hidden = !keepNode;
                       }
 
                       for (var j = 0; j < edgesArray.length; j++) {
-                          var keepEdge = connectedEdges.indexOf(edgesArray[j].id) !== -1;
-                          edgesArray[j].hidden = !keepEdge;
+                          var hideEdge = !keepEdgeIds[edgesArray[j].id];
+                          if (!!edgesArray[j].hidden !== hideEdge) {
+                              edgePatches.push({ id: edgesArray[j].id, hidden: hideEdge });
+                          }
                       }
 
-                      nodes.update(nodesArray);
-                      edges.update(edgesArray);
+                      // Fold the centered layout into the visibility patches so each node is
+                      // written once, in a single DataSet update.
+                      var patchById = {};
+                      for (var p = 0; p < nodePatches.length; p++) {
+                          patchById[nodePatches[p].id] = nodePatches[p];
+                      }
+                      var layoutPatches = layoutVisibleNodesCentered(nodeId, nodesArray, keepIds);
+                      for (var q = 0; q < layoutPatches.length; q++) {
+                          var lp = layoutPatches[q];
+                          var existing = patchById[lp.id];
+                          if (existing) {
+                              for (var field in lp) {
+                                  existing[field] = lp[field];
+                              }
+                          } else {
+                              patchById[lp.id] = lp;
+                              nodePatches.push(lp);
+                          }
+                      }
+
+                      if (nodePatches.length) nodes.update(nodePatches);
+                      if (edgePatches.length) edges.update(edgePatches);
                       network.setOptions({
                           physics: { enabled: false },
                           edges: { smooth: false }
                       });
-                      layoutVisibleNodesCentered(nodeId);
                       applyCenterEdgeEncoding(nodeId);
                       network.fit({ animation: false });
                       renderMatchups(nodeId);
                       updateNodeSummary(nodeId);
                   }
 
+                  // Same ordering as localeCompare, without setting up the locale data per comparison.
+                  var labelCollator = new Intl.Collator();
+
                   function rebuildArchetypeOptions() {
-                      var nodeList = visibleDataNodes();
+                      var nodeList = visibleDataNodes().map(function(n) {
+                          return { value: n.id, text: String(n.display_label || n.id) };
+                      });
                       nodeList.sort(function(a, b) {
-                          return String(a.display_label || a.id).localeCompare(String(b.display_label || b.id));
+                          return labelCollator.compare(a.text, b.text);
                       });
 
                       var options = [{ value: '__all__', text: 'All' }];
                       for (var i = 0; i < nodeList.length; i++) {
-                          options.push({ value: nodeList[i].id, text: (nodeList[i].display_label || nodeList[i].id) });
+                          options.push({ value: nodeList[i].value, text: nodeList[i].text });
                       }
 
                       if (tomSelectRef) {
@@ -778,13 +602,9 @@ def inject_filter_ui(
                           return;
                       }
 
-                      filterSelect.innerHTML = '';
-                      for (var j = 0; j < options.length; j++) {
-                          var opt = document.createElement('option');
-                          opt.value = options[j].value;
-                          opt.textContent = options[j].text;
-                          filterSelect.appendChild(opt);
-                      }
+                      filterSelect.innerHTML = options.map(function(o) {
+                          return '<option value="' + escapeHtml(o.value) + '">' + escapeHtml(o.text) + '</option>';
+                      }).join('');
 
                       if (window.TomSelect) {
                           tomSelectRef = new TomSelect('#archetypeFilter', {
@@ -810,11 +630,15 @@ def inject_filter_ui(
                   }
 
                   function orderedRangeKeys(rangeKeys) {
+                      var available = Object.create(null);
+                      for (var x = 0; x < rangeKeys.length; x++) {
+                          available[rangeKeys[x]] = true;
+                      }
                       var seen = {};
                       var ordered = [];
                       for (var i = 0; i < rangeOrder.length; i++) {
                           var rk = rangeOrder[i];
-                          if (rangeKeys.indexOf(rk) !== -1 && !seen[rk]) {
+                          if (available[rk] && !seen[rk]) {
                               ordered.push(rk);
                               seen[rk] = true;
                           }
@@ -875,6 +699,52 @@ def inject_filter_ui(
                       return selectedKey;
                   }
 
+                  // Format/range whose dataset is being fetched; a later selection supersedes it.
+                  var pendingDatasetKey = null;
+
+                  function fetchDataset(formatKey, rangeKey, dataset) {
+                      var requestKey = formatKey + '/' + rangeKey;
+                      if (pendingDatasetKey === requestKey) {
+                          return;
+                      }
+                      if (!baseReady) {
+                          // Switched before the deferred setup ran: set up the dataset on screen now
+                          // (it stays there while the fetch runs, or if it fails), so the idle
+                          // callback can't load it over the pending choice. Keep the user's selection.
+                          finishStartup();
+                          if (formatSelect) {
+                              formatSelect.value = formatKey;
+                          }
+                          rebuildRangeOptions(formatKey, rangeKey);
+                      }
+                      pendingDatasetKey = requestKey;
+                      fetch(dataset.src)
+                          .then(function(resp) {
+                              if (!resp.ok) {
+                                  throw new Error('HTTP ' + resp.status + ' for ' + dataset.src);
+                              }
+                              return resp.json();
+                          })
+                          .then(function(payload) {
+                              Object.assign(dataset, payload);
+                              delete dataset.src;
+                              if (pendingDatasetKey === requestKey) {
+                                  loadDataset(formatKey, rangeKey);
+                              }
+                          })
+                          .catch(function(err) {
+                              console.error('Could not load dataset ' + requestKey, err);
+                              if (pendingDatasetKey === requestKey) {
+                                  // Put the selectors back on the dataset that is still displayed.
+                                  pendingDatasetKey = null;
+                                  if (formatSelect) {
+                                      formatSelect.value = currentFormatKey;
+                                  }
+                                  rebuildRangeOptions(currentFormatKey, currentRangeKey);
+                              }
+                          });
+                  }
+
                   function loadDataset(formatKey, rangeKey) {
                       var entry = getFormatEntry(formatKey);
                       if (!entry) {
@@ -885,15 +755,25 @@ def inject_filter_ui(
                       if (!dataset) {
                           return;
                       }
+                      if (dataset.src) {
+                          // Linked pages embed only the default dataset; the rest are fetched on first use.
+                          fetchDataset(formatKey, selectedRangeKey, dataset);
+                          return;
+                      }
+                      pendingDatasetKey = null;
 
                       currentFormatKey = entry.key || formatKey;
                       currentRangeKey = dataset.key || selectedRangeKey;
 
-                      nodes = new vis.DataSet(dataset.nodes || []);
-                      edges = new vis.DataSet(dataset.edges || []);
-                      network.setData({ nodes: nodes, edges: edges });
+                      // Swap the contents of the DataSets the network already listens to instead of
+                      // handing it new ones (setData rebuilds the network's data bindings each time).
+                      network.unselectAll();
+                      edges.clear();
+                      nodes.clear();
+                      nodes.add(dataset.nodes || []);
+                      edges.add(dataset.edges || []);
 
-                      initBaseState();
+                      initBaseState(dataset);
                       rebuildArchetypeOptions();
                       showAll();
                       clearNodeSummary();
@@ -942,26 +822,33 @@ def inject_filter_ui(
                       return Math.max(0, Math.min(1, x));
                   }
 
+                  // Backgrounds come from WR_LUT, so only a bounded set of colours is ever parsed.
+                  var textColorCache = Object.create(null);
+                  var RGB_RE = /rgb\\((\\d+),(\\d+),(\\d+)\\)/;
+
                   function rgbTextColor(rgbStr) {
-                      var m = /rgb\\((\\d+),(\\d+),(\\d+)\\)/.exec(rgbStr || '');
-                      if (!m) return '#0b1320';
-                      var r = Number(m[1]) / 255;
-                      var g = Number(m[2]) / 255;
-                      var b = Number(m[3]) / 255;
-                      var luminance = 0.2126 * r + 0.7152 * g + 0.0722 * b;
-                      return luminance > 0.55 ? '#0b1320' : '#f8fafc';
+                      var key = rgbStr || '';
+                      var cached = textColorCache[key];
+                      if (cached) return cached;
+                      var m = RGB_RE.exec(key);
+                      var fg = '#0b1320';
+                      if (m) {
+                          var r = Number(m[1]) / 255;
+                          var g = Number(m[2]) / 255;
+                          var b = Number(m[3]) / 255;
+                          var luminance = 0.2126 * r + 0.7152 * g + 0.0722 * b;
+                          fg = luminance > 0.55 ? '#0b1320' : '#f8fafc';
+                      }
+                      textColorCache[key] = fg;
+                      return fg;
                   }
 
                   function matchupFor(rowId, colId) {
                       if (rowId === colId) {
                           return { wr: 0.5, matches: 0, diag: true };
                       }
-                      var edgeAB = edges.get({
-                          filter: function(e) { return e.from === rowId && e.to === colId; }
-                      })[0];
-                      var edgeBA = edges.get({
-                          filter: function(e) { return e.from === colId && e.to === rowId; }
-                      })[0];
+                      var edgeAB = baseEdgeByPair[rowId] && baseEdgeByPair[rowId][colId];
+                      var edgeBA = baseEdgeByPair[colId] && baseEdgeByPair[colId][rowId];
                       var edge = edgeAB || edgeBA;
                       if (!edge) {
                           return null;
@@ -978,7 +865,25 @@ def inject_filter_ui(
                       };
                   }
 
+                  var MATRIX_PAGE_HEAD = '<!doctype html><html><head><meta charset="utf-8" />'
+                      + '<title>MTG Winrate Matrix</title>'
+                      + '<style>'
+                      + 'body{background:#0b0f14;color:#e5e7eb;font-family:Arial,sans-serif;margin:0;padding:12px;}'
+                      + 'h2{margin:0 0 8px 0;font-size:18px;}'
+                      + '.sub{color:#9ca3af;font-size:12px;margin-bottom:10px;}'
+                      + 'table{border-collapse:collapse;width:100%;table-layout:fixed;font-size:11px;}'
+                      + 'th,td{border:1px solid #1f2937;padding:4px;vertical-align:top;text-align:center;}'
+                      + 'th{background:#111827;color:#f3f4f6;position:sticky;top:0;z-index:2;}'
+                      + '.rowhdr{position:sticky;left:0;z-index:1;background:#0f172a;text-align:left;font-weight:700;}'
+                      + '.cell{min-height:52px;display:flex;flex-direction:column;gap:2px;align-items:center;justify-content:center;}'
+                      + '.cell .wr{font-weight:800;font-size:12px;}'
+                      + '.cell .matches{font-size:10px;opacity:.9;}'
+                      + '.overall{background:#0f172a;}'
+                      + '</style></head><body>'
+                      + '<h2>Winrate Matrix</h2>';
+
                   function openMatrixView() {
+                      finishStartup();
                       var dataNodes = visibleDataNodes();
                       if (!dataNodes.length) {
                           return;
@@ -1010,66 +915,48 @@ def inject_filter_ui(
                           : null;
                       var rangeLabel = rangeEntry && rangeEntry.label ? rangeEntry.label : currentRangeKey;
 
-                      var htmlParts = [];
-                      htmlParts.push('<!doctype html><html><head><meta charset="utf-8" />');
-                      htmlParts.push('<title>MTG Winrate Matrix</title>');
-                      htmlParts.push('<style>');
-                      htmlParts.push('body{background:#0b0f14;color:#e5e7eb;font-family:Arial,sans-serif;margin:0;padding:12px;}');
-                      htmlParts.push('h2{margin:0 0 8px 0;font-size:18px;}');
-                      htmlParts.push('.sub{color:#9ca3af;font-size:12px;margin-bottom:10px;}');
-                      htmlParts.push('table{border-collapse:collapse;width:100%;table-layout:fixed;font-size:11px;}');
-                      htmlParts.push('th,td{border:1px solid #1f2937;padding:4px;vertical-align:top;text-align:center;}');
-                      htmlParts.push('th{background:#111827;color:#f3f4f6;position:sticky;top:0;z-index:2;}');
-                      htmlParts.push('.rowhdr{position:sticky;left:0;z-index:1;background:#0f172a;text-align:left;font-weight:700;}');
-                      htmlParts.push('.cell{min-height:52px;display:flex;flex-direction:column;gap:2px;align-items:center;justify-content:center;}');
-                      htmlParts.push('.cell .wr{font-weight:800;font-size:12px;}');
-                      htmlParts.push('.cell .matches{font-size:10px;opacity:.9;}');
-                      htmlParts.push('.overall{background:#0f172a;}');
-                      htmlParts.push('</style></head><body>');
-                      htmlParts.push('<h2>Winrate Matrix</h2>');
+                      var htmlParts = [MATRIX_PAGE_HEAD];
                       htmlParts.push('<div class="sub">Format: ' + fmtLabel + ' | Range: ' + rangeLabel + '</div>');
                       htmlParts.push('<div style="overflow:auto;max-height:85vh;border:1px solid #1f2937;">');
-                      htmlParts.push('<table><thead><tr>');
-                      htmlParts.push('<th class="rowhdr">Deck</th>');
-                      htmlParts.push('<th>Overall</th>');
+                      var headCells = new Array(ids.length);
                       for (var c = 0; c < ids.length; c++) {
-                          htmlParts.push('<th>' + labels[ids[c]] + '</th>');
+                          headCells[c] = '<th>' + labels[ids[c]] + '</th>';
                       }
-                      htmlParts.push('</tr></thead><tbody>');
+                      htmlParts.push('<table><thead><tr><th class="rowhdr">Deck</th><th>Overall</th>' + headCells.join('') + '</tr></thead><tbody>');
 
+                      // One string per cell, joined per row.
+                      var rowCells = new Array(ids.length);
                       for (var r = 0; r < ids.length; r++) {
                           var rid = ids[r];
-                          htmlParts.push('<tr>');
-                          htmlParts.push('<td class="rowhdr">' + labels[rid] + '</td>');
-
                           var owr = overallWr[rid];
                           var oMatches = overallMatches[rid];
                           var oBg = owr !== null ? winrateColor(owr) : 'rgb(20,20,20)';
                           var oFg = rgbTextColor(oBg);
-                          htmlParts.push('<td class="overall" style="background:' + oBg + ';color:' + oFg + ';">');
-                          htmlParts.push('<div class="cell">');
-                          htmlParts.push('<div class="wr">' + (owr !== null ? (owr * 100).toFixed(1) + '%' : 'n/a') + '</div>');
-                          htmlParts.push('<div class="matches">' + (oMatches || 0).toLocaleString() + ' matches</div>');
-                          htmlParts.push('</div></td>');
 
                           for (var c2 = 0; c2 < ids.length; c2++) {
                               var cid = ids[c2];
                               var m = matchupFor(rid, cid);
                               if (!m) {
-                                  htmlParts.push('<td></td>');
+                                  rowCells[c2] = '<td></td>';
                                   continue;
                               }
                               var isDiag = rid === cid;
                               var bg = isDiag ? '#7dd3fc' : winrateColor(m.wr);
                               var fg = isDiag ? '#0b1320' : rgbTextColor(bg);
-                              htmlParts.push('<td style="background:' + bg + ';color:' + fg + ';">');
-                              htmlParts.push('<div class="cell">');
-                              htmlParts.push('<div class="wr">' + (isDiag ? '—' : (m.wr * 100).toFixed(1) + '%') + '</div>');
-                              htmlParts.push('<div class="matches">' + (m.matches || 0).toLocaleString() + ' matches</div>');
-                              htmlParts.push('</div></td>');
+                              rowCells[c2] = '<td style="background:' + bg + ';color:' + fg + ';"><div class="cell">'
+                                  + '<div class="wr">' + (isDiag ? '—' : (m.wr * 100).toFixed(1) + '%') + '</div>'
+                                  + '<div class="matches">' + (m.matches || 0).toLocaleString() + ' matches</div>'
+                                  + '</div></td>';
                           }
 
-                          htmlParts.push('</tr>');
+                          htmlParts.push(
+                              '<tr><td class="rowhdr">' + labels[rid] + '</td>'
+                              + '<td class="overall" style="background:' + oBg + ';color:' + oFg + ';"><div class="cell">'
+                              + '<div class="wr">' + (owr !== null ? (owr * 100).toFixed(1) + '%' : 'n/a') + '</div>'
+                              + '<div class="matches">' + (oMatches || 0).toLocaleString() + ' matches</div>'
+                              + '</div></td>'
+                              + rowCells.join('') + '</tr>'
+                          );
                       }
 
                       htmlParts.push('</tbody></table></div></body></html>');
@@ -1084,6 +971,12 @@ def inject_filter_ui(
 
                   network.on('selectNode', function(params) {
                       if (params.nodes && params.nodes.length > 0) {
+                          // A click before the deferred setup: run it first, so the archetype options
+                          // exist when the filter is set below (the load also clears the selection).
+                          if (!baseReady) {
+                              finishStartup();
+                              network.selectNodes([params.nodes[0]]);
+                          }
                           var nodeId = params.nodes[0];
                           var nodeObj = nodes.get(nodeId) || {};
                           if (nodeObj.is_label_node && nodeObj.base_id) {
@@ -1104,10 +997,15 @@ def inject_filter_ui(
                       }
                   });
 
-                  function initBaseState() {
+                  function initBaseState(dataset) {
+                      baseReady = true;
+                      viewState = null;
                       baseNodeState = {};
                       baseEdgeState = {};
                       baseSizes = {};
+                      baseNodeEdges = {};
+                      baseNodeNeighbors = {};
+                      baseEdgeByPair = Object.create(null);
                       var nodeList = nodes.get();
                       for (var i = 0; i < nodeList.length; i++) {
                           var nn = nodeList[i];
@@ -1130,19 +1028,44 @@ def inject_filter_ui(
                               width: edgeList[j].width
                           };
                       }
+                      // Adjacency index (edge ids and neighbour ids per node) for selections,
+                      // resolved from the edge positions precomputed in Python.
+                      var datasetEdges = dataset.edges || [];
+                      var nodeEdges = dataset.node_edges || {};
+                      Object.keys(nodeEdges).forEach(function(nodeId) {
+                          var positions = nodeEdges[nodeId];
+                          var ids = new Array(positions.length);
+                          var neighbors = new Array(positions.length);
+                          for (var k = 0; k < positions.length; k++) {
+                              var de = datasetEdges[positions[k]];
+                              ids[k] = de.id;
+                              neighbors[k] = de.from === nodeId ? de.to : de.from;
+                          }
+                          baseNodeEdges[nodeId] = ids;
+                          baseNodeNeighbors[nodeId] = neighbors;
+                      });
+                      // from -> to -> edge, for the matrix view (first edge wins, like the scans it replaced).
+                      for (var p = 0; p < datasetEdges.length; p++) {
+                          var pe = datasetEdges[p];
+                          var byTo = baseEdgeByPair[pe.from] || (baseEdgeByPair[pe.from] = Object.create(null));
+                          if (!byTo[pe.to]) {
+                              byTo[pe.to] = pe;
+                          }
+                      }
                   }
 
-                  function layoutVisibleNodesCentered(centerId) {
-                      var nodeList = nodes.get();
+                  // Returns position patches for the data nodes kept by showRelations (center at
+                  // the origin, the rest on a ring) and their labels.
+                  function layoutVisibleNodesCentered(centerId, nodeList, keepIds) {
                       var visible = [];
                       for (var i = 0; i < nodeList.length; i++) {
                           var nn = nodeList[i];
-                          if (!nn.hidden && !nn.is_label_node) {
+                          if (keepIds[nn.id] && !nn.is_label_node) {
                               visible.push(nn);
                           }
                       }
                       if (visible.length === 0) {
-                          return;
+                          return [];
                       }
 
                       var center = null;
@@ -1155,7 +1078,7 @@ def inject_filter_ui(
                           }
                       }
                       if (!center) {
-                          return;
+                          return [];
                       }
 
                       others.sort(function(a, b) {
@@ -1203,22 +1126,20 @@ def inject_filter_ui(
                               });
                           }
                       }
-                      nodes.update(updates);
-                      nodes.update(labelUpdates);
+                      return updates.concat(labelUpdates);
                   }
 
                   function applyCenterEdgeEncoding(centerId) {
-                      var edgesArray = edges.get();
+                      // Only the center's own edges change; fetch them through the adjacency index.
+                      var edgesArray = edges.get(baseNodeEdges[centerId] || [], {
+                          filter: function(item) { return !item.hidden; }
+                      });
 
                       var minM = Infinity;
                       var maxM = -Infinity;
                       for (var i = 0; i < edgesArray.length; i++) {
-                          var e0 = edgesArray[i];
-                          if (e0.hidden) continue;
-                          if (e0.from !== centerId && e0.to !== centerId) continue;
-
-                          var mm = (e0.matches !== undefined && e0.matches !== null) ? Number(e0.matches) : 0;
-                          if (isFinite(mm) && mm > 0) {
+                          var mm = edgesArray[i].matches || 0;
+                          if (mm > 0) {
                               if (mm < minM) minM = mm;
                               if (mm > maxM) maxM = mm;
                           }
@@ -1227,11 +1148,7 @@ def inject_filter_ui(
 
                       for (var j = 0; j < edgesArray.length; j++) {
                           var e = edgesArray[j];
-                          if (e.hidden) continue;
-                          if (e.from !== centerId && e.to !== centerId) continue;
-
-                          var mm2 = (e.matches !== undefined && e.matches !== null) ? Number(e.matches) : 0;
-                          e.width = edgeWidthScale(mm2, minM, maxM);
+                          e.width = edgeWidthScale(e.matches || 0, minM, maxM);
 
                           var winrateFrom = (e.winrate_from !== undefined && e.winrate_from !== null)
                               ? e.winrate_from
@@ -1275,9 +1192,8 @@ def inject_filter_ui(
                       var nodeLabel = nodeObj.display_label || nodeObj.id || nodeId;
                       panelTitle.textContent = nodeLabel;
                       updateSortSubtitle();
-                      matchupBody.innerHTML = '';
 
-                      var connectedEdges = network.getConnectedEdges(nodeId);
+                      var connectedEdges = baseNodeEdges[nodeId] || [];
                       var rows = [];
                       for (var i = 0; i < connectedEdges.length; i++) {
                           var e = edges.get(connectedEdges[i]);
@@ -1318,21 +1234,23 @@ def inject_filter_ui(
                           return sortDir === 'asc' ? (av - bv) : (bv - av);
                       });
 
+                      // One innerHTML assignment instead of per-row createElement/appendChild.
+                      var html = '';
                       for (var k = 0; k < rows.length; k++) {
                           var r = rows[k];
-                          var tr = document.createElement('tr');
-                          var tdOpponent = document.createElement('td');
-                          var tdWr = document.createElement('td');
-                          var tdM = document.createElement('td');
-                          tdOpponent.textContent = r.opponent;
-                          tdWr.textContent = (r.winrate * 100).toFixed(1) + '%';
-                          tdM.textContent = r.matches.toLocaleString();
-                          tdWr.style.color = winrateColor(r.winrate);
-                          tr.appendChild(tdOpponent);
-                          tr.appendChild(tdWr);
-                          tr.appendChild(tdM);
-                          matchupBody.appendChild(tr);
+                          html += '<tr><td>' + escapeHtml(r.opponent) + '</td>'
+                              + '<td style="color:' + winrateColor(r.winrate) + '">' + (r.winrate * 100).toFixed(1) + '%</td>'
+                              + '<td>' + r.matches.toLocaleString() + '</td></tr>';
                       }
+                      matchupBody.innerHTML = html;
+                  }
+
+                  function escapeHtml(text) {
+                      return String(text)
+                          .replace(/&/g, '&amp;')
+                          .replace(/</g, '&lt;')
+                          .replace(/>/g, '&gt;')
+                          .replace(/"/g, '&quot;');
                   }
 
                   function setSort(key) {
@@ -1374,10 +1292,12 @@ def inject_filter_ui(
                       });
                   }
 
+                  var SORT_LABELS = { deck: 'deck', winrate: 'winrate', matches: 'matches' };
+
                   function updateSortSubtitle() {
                       var key = window.__tableSortKey || 'matches';
                       var dir = window.__tableSortDir || 'desc';
-                      var label = key === 'deck' ? 'deck' : (key === 'winrate' ? 'winrate' : 'matches');
+                      var label = SORT_LABELS[key] || 'matches';
                       panelSubtitle.textContent = 'Sorted by ' + label + ' (' + dir + ')';
                   }
 
@@ -1385,11 +1305,44 @@ def inject_filter_ui(
                       formatSelect.value = defaultFormatKey;
                   }
                   var initialRangeKey = rebuildRangeOptions(defaultFormatKey, defaultRangeKey);
-                  loadDataset(defaultFormatKey, initialRangeKey);
+
+                  // The network already shows the default dataset, so the per-dataset setup
+                  // (base state, archetype options, TomSelect) waits until after the first paint.
+                  // Anything that needs it earlier runs it on demand.
+                  function finishStartup() {
+                      if (!baseReady) {
+                          loadDataset(defaultFormatKey, initialRangeKey);
+                      }
+                  }
+
+                  network.once('afterDrawing', function() {
+                      if (window.requestIdleCallback) {
+                          window.requestIdleCallback(finishStartup, { timeout: 500 });
+                      } else {
+                          setTimeout(finishStartup, 0);
+                      }
+                  });
+
+                  // Arrow scale factors on a log2(zoom) grid (step 0.05 over -0.5..2.5, where the
+                  // factor moves between its 1.2 and 0.3 clamps); zoom 1 falls exactly on a grid point.
+                  var ARROW_LUT_MIN = -0.5;
+                  var ARROW_LUT_STEP = 0.05;
+                  var ARROW_LUT = new Array(61);
+                  for (var arrowIdx = 0; arrowIdx < ARROW_LUT.length; arrowIdx++) {
+                      var gridScale = Math.pow(2, ARROW_LUT_MIN + arrowIdx * ARROW_LUT_STEP);
+                      ARROW_LUT[arrowIdx] = Math.max(0.3, Math.min(1.2, 1 / Math.pow(gridScale, 0.7)));
+                  }
+                  var lastArrowFactor = null;
 
                   function applyArrowScale() {
                       var scale = network.getScale();
-                      var factor = Math.max(0.3, Math.min(1.2, 1 / Math.pow(scale, 0.7)));
+                      var bin = Math.round((Math.log2(scale) - ARROW_LUT_MIN) / ARROW_LUT_STEP);
+                      var factor = ARROW_LUT[Math.max(0, Math.min(ARROW_LUT.length - 1, bin))];
+                      // Zoom events within one grid step map to the same factor: skip the re-render.
+                      if (factor === lastArrowFactor) {
+                          return;
+                      }
+                      lastArrowFactor = factor;
                       network.setOptions({
                           edges: {
                               arrows: { to: { enabled: true, scaleFactor: factor } }
@@ -1397,51 +1350,418 @@ def inject_filter_ui(
                       });
                   }
 
+                  // Wheel/pinch zoom fires many events per frame; apply the arrow scale once per frame.
+                  var arrowScalePending = false;
                   network.on('zoom', function() {
-                      applyArrowScale();
+                      if (arrowScalePending) {
+                          return;
+                      }
+                      arrowScalePending = true;
+                      window.requestAnimationFrame(function() {
+                          arrowScalePending = false;
+                          applyArrowScale();
+                      });
                   });
 
                   applyArrowScale();
+    """
+
+
+_NODE_FONT: Dict[str, Any] = {
+    "color": "#ffffff",
+    "size": 16,
+    "strokeWidth": 3,
+    "strokeColor": "#101010",
+    "align": "center",
+    "vadjust": 0,
+}
+# Label nodes all share one (read-only) font dict; it is only ever serialized.
+_LABEL_FONT: Dict[str, Any] = dict(_NODE_FONT)
+
+
+def _build_dataset(G: nx.DiGraph, archetypes_df: pd.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
+    ids, xy = compute_radial_positions(archetypes_df)
+    row_of = {node_id: i for i, node_id in enumerate(ids.tolist())}
+    xy_rows = xy.tolist()
+
+    nodes: List[Dict[str, Any]] = []
+    label_nodes: List[Dict[str, Any]] = []
+    for node_id, attrs in G.nodes(data=True):
+        size_val = float(attrs.get("size", 25))
+        matches_val = int(attrs.get("matches", 0))
+        ow = attrs.get("overall_winrate")
+        has_wr = isinstance(ow, float)
+        wr_txt = f"{ow * 100:.1f}%" if has_wr else "n/a"
+        label = f"Winrate: {wr_txt}\nMatches: {matches_val:,}"
+        font_size = max(8, min(18, size_val * 0.33))
+
+        node: Dict[str, Any] = {
+            "id": node_id,
+            "display_label": node_id,
+            "label": label,
+            "size": size_val,
+            "title": attrs.get("title", node_id),
+            "shape": "circle",
+            "font": {**_NODE_FONT, "size": font_size},
+            "matches": matches_val,
+            "overall_winrate": float(ow) if has_wr else None,
+        }
+
+        if attrs.get("color"):
+            node["color"] = attrs["color"]
+
+        if attrs.get("url"):
+            node["url"] = attrs["url"]
+
+        row = row_of.get(node_id)
+        if row is not None:
+            x, y = xy_rows[row]
+            node["x"] = x
+            node["y"] = y
+            node["fixed"] = True
+
+            # External label node (archetype name) with uniform size.
+            label_nodes.append(
+                {
+                    "id": f"label::{node_id}",
+                    "base_id": node_id,
+                    "is_label_node": True,
+                    "label": node_id,
+                    "shape": "text",
+                    "physics": False,
+                    "x": x,
+                    "y": y - (size_val * 1.15 + 28),
+                    "fixed": True,
+                    "font": _LABEL_FONT,
+                }
+            )
+
+        nodes.append(node)
+
+    edges: List[Dict[str, Any]] = []
+    # Positions into `edges` per node, so the page gets its adjacency index without rebuilding it.
+    node_edges: Dict[str, List[int]] = {}
+    for idx, (src, dst, attrs) in enumerate(G.edges(data=True)):
+        edge: Dict[str, Any] = {
+            "id": f"e{idx}_{src}__{dst}",
+            "from": src,
+            "to": dst,
+            "width": float(attrs.get("width", 2)),
+            "color": attrs.get("color", "#888888"),
+            "label": "",
+            "title": attrs.get("title", ""),
+            "matches": int(attrs.get("matches", 0)),
+            "winrate": float(attrs.get("winrate", 0.5)),
+            "winrate_from": float(attrs.get("winrate_from", attrs.get("winrate", 0.5))),
+            "neutral": bool(attrs.get("neutral", False)),
+            "arrows": attrs.get("arrows", "to"),
+        }
+
+        if edge["neutral"]:
+            edge["arrows"] = {"to": {"enabled": False}}
+
+        edges.append(edge)
+        node_edges.setdefault(src, []).append(idx)
+        node_edges.setdefault(dst, []).append(idx)
+
+    return {"nodes": nodes + label_nodes, "edges": edges, "node_edges": node_edges}
+
+
+def render_pyvis(
+    graphs_by_format: Dict[str, Dict[str, Tuple[nx.DiGraph, pd.DataFrame]]],
+    out_html: str,
+    default_format_key: str,
+    default_range_key: str,
+) -> None:
+    if default_format_key not in graphs_by_format:
+        raise KeyError(f"default_format_key '{default_format_key}' not found in graphs_by_format")
+    if default_range_key not in graphs_by_format[default_format_key]:
+        raise KeyError(
+            f"default_range_key '{default_range_key}' not found in graphs_by_format[{default_format_key!r}]"
+        )
+
+    datasets_by_format: Dict[str, Dict[str, Any]] = {}
+    for format_key, ranges_dict in graphs_by_format.items():
+        format_meta = FORMATS.get(format_key, {})
+        ranges_payload: Dict[str, Dict[str, Any]] = {}
+        for range_key, (G, df) in ranges_dict.items():
+            range_meta = RANGE_OPTIONS.get(range_key, {})
+            ranges_payload[range_key] = {
+                "key": range_key,
+                "label": range_meta.get("label", range_key),
+                **_build_dataset(G, df),
+            }
+
+        if not ranges_payload:
+            continue
+
+        datasets_by_format[format_key] = {
+            "key": format_key,
+            "label": format_meta.get("label", format_key),
+            "ranges": ranges_payload,
+        }
+
+    # The page script swaps in the selected dataset right after creating the network, so the
+    # initial vis data is the default payload as built above (no from_nx / override pass).
+    default_payload = datasets_by_format[default_format_key]["ranges"][default_range_key]
+    net = Network(height="800px", width="100%", directed=True, bgcolor="#1f1f1f", font_color="#e6e6e6")
+    net.nodes = default_payload["nodes"]
+    net.edges = default_payload["edges"]
+
+    net.set_options(
+        """
+    var options = {
+      "interaction": {
+        "hover": true,
+        "multiselect": true,
+        "navigationButtons": false,
+        "zoomView": true,
+        "dragView": true,
+        "hideEdgesOnDrag": true,
+        "hideNodesOnDrag": false,
+        "tooltipDelay": 200
+      },
+      "physics": { "enabled": false },
+      "nodes": { "shape": "dot" },
+      "edges": {
+        "smooth": false,
+        "font": { "align": "top" }
+      }
+    }
     """)
 
-    html = html.replace("</head>", f"{extra_head}\n</head>")
-    html = html.replace("</style>", f"{extra_css}\n        </style>")
-    html = html.replace(
-        "<div id=\"mynetwork\" class=\"card-body\"></div>",
-        f"{controls_html}\n{sidepanel_html}\n{footer_html}",
+    if LAZY_DATASETS and not EMBED_ASSETS:
+        datasets_by_format = write_lazy_datasets(
+            datasets_by_format, Path(out_html).parent, default_format_key, default_range_key
+        )
+
+    # Build the whole page in memory and write it once; the lib/ assets that write_html
+    # would copy into the working directory are already tracked in the repo.
+    html = net.generate_html(notebook=False)
+    html = inject_filter_ui(
+        html,
+        datasets_by_format=datasets_by_format,
+        default_format_key=default_format_key,
+        default_range_key=default_range_key,
     )
-    html = html.replace("network = new vis.Network(container, data, options);", "network = new vis.Network(container, data, options);\n" + extra_js)
+    data = html.encode("utf-8")
+    if EMBED_ASSETS:
+        data = inline_assets(data)
+    else:
+        data = strip_cdn_tags(data)
+        copy_local_assets(Path(out_html).parent)
 
-    html_path.write_text(html, encoding="utf-8")
+    if not PRECOMPRESS_HTML:
+        Path(out_html).write_bytes(data)
+        return
+    # zlib/brotli release the GIL, so the sidecars compress while the page itself is written.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        sidecars = pool.submit(write_precompressed, out_html, data)
+        Path(out_html).write_bytes(data)
+        sidecars.result()
+
+
+def _compact_source(text: str, line_comments: bool = False) -> str:
+    # Drops indentation, blank lines and (for JS) whole-line // comments. Line breaks are kept,
+    # so statement boundaries are unchanged; the constants above stay readable in this file.
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(
+        line for line in lines if line and not (line_comments and line.startswith("//"))
+    )
 
 
-def inline_assets(out_html: str) -> None:
-    html_path = Path(out_html)
-    html = html_path.read_text(encoding="utf-8")
+# What the page actually gets: the CSS and script above, about half their indented size.
+_PAGE_CSS = _compact_source(_EXTRA_CSS)
+_PAGE_JS = _compact_source(_EXTRA_JS, line_comments=True)
 
-    def read_text(path: str) -> str:
-        return Path(path).read_text(encoding="utf-8")
+# Anchors in pyvis's template that inject_filter_ui rewrites.
+_NETWORK_DIV = '<div id="mynetwork" class="card-body"></div>'
+_NETWORK_CTOR = "network = new vis.Network(container, data, options);"
+_ANCHOR_RE = re.compile("|".join(re.escape(a) for a in ("</head>", "</style>", _NETWORK_DIV, _NETWORK_CTOR)))
 
-    replacements = [
-        ("<script src=\"lib/bindings/utils.js\"></script>", "<script>\n" + read_text("lib/bindings/utils.js") + "\n</script>"),
-        ("<link rel=\"stylesheet\" href=\"lib/vis-9.1.2/vis-network.css\" />", "<style>\n" + read_text("lib/vis-9.1.2/vis-network.css") + "\n</style>"),
-        ("<script src=\"lib/vis-9.1.2/vis-network.min.js\"></script>", "<script>\n" + read_text("lib/vis-9.1.2/vis-network.min.js") + "\n</script>"),
-        ("<link rel=\"stylesheet\" href=\"lib/tom-select/tom-select.css\" />", "<style>\n" + read_text("lib/tom-select/tom-select.css") + "\n</style>"),
-        ("<script src=\"lib/tom-select/tom-select.complete.min.js\"></script>", "<script>\n" + read_text("lib/tom-select/tom-select.complete.min.js") + "\n</script>"),
-        ("<link rel=\"stylesheet\" href=\"https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css\" integrity=\"sha512-WgxfT5LWjfszlPHXRmBWHkV2eceiWTOBvrKCNbdgDYTHrT2AeLCGbF4sZlZw3UMN3WtL0tGUoIAKsu8mllg/XA==\" crossorigin=\"anonymous\" referrerpolicy=\"no-referrer\" />", "<style>\n" + read_text("lib/vis-9.1.2/vis-network.css") + "\n</style>"),
-        ("<script src=\"https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js\" integrity=\"sha512-LnvoEWDFrqGHlHmDD2101OrLcbsfkrzoSpvtSQtxK3RMnRV0eOkhhBN2dXHKRrUU8p2DGRTk35n4O8nWSVe1mQ==\" crossorigin=\"anonymous\" referrerpolicy=\"no-referrer\"></script>", "<script>\n" + read_text("lib/vis-9.1.2/vis-network.min.js") + "\n</script>"),
-    ]
 
-    for old, new in replacements:
-        if old in html:
-            html = html.replace(old, new)
+def inject_filter_ui(
+    html: str,
+    datasets_by_format: Dict[str, Dict[str, Any]],
+    default_format_key: str,
+    default_range_key: str,
+) -> str:
+    if default_format_key not in datasets_by_format:
+        raise KeyError(f"default_format_key '{default_format_key}' not found in datasets_by_format")
+    if default_range_key not in datasets_by_format[default_format_key].get("ranges", {}):
+        raise KeyError(
+            f"default_range_key '{default_range_key}' not found in datasets_by_format[{default_format_key!r}]['ranges']"
+        )
+
+    updated_at_utc = datetime.now(timezone.utc).strftime("%B %d, %Y at %H:%M UTC")
+    # Shipped as an inert JSON data block (parsed once with JSON.parse) rather than a JS
+    # object literal; "<" is escaped so the payload can never close the <script> element.
+    datasets_json = _dumps_compact(datasets_by_format).replace("<", "\\u003c")
+    datasets_html = f'<script type="application/json" id="datasetsData">{datasets_json}</script>'
+
+    # Options in config order, limited to what was actually built.
+    format_options_html = "\n                    ".join(
+        _option_html(key, datasets_by_format[key].get("label", key), key == default_format_key)
+        for key in FORMATS
+        if key in datasets_by_format
+    )
+
+    default_ranges = datasets_by_format[default_format_key].get("ranges", {})
+    range_options_html = "\n                    ".join(
+        _option_html(key, default_ranges[key].get("label", key), key == default_range_key)
+        for key in RANGE_OPTIONS
+        if key in default_ranges
+    )
+
+    controls_html = _CONTROLS_HTML.format(
+        format_options=format_options_html, range_options=range_options_html
+    )
+
+    footer_html = _FOOTER_HTML.format(updated_at=updated_at_utc)
 
-    # Remove external bootstrap references to make the HTML standalone
-    bootstrap_links = [
-        "<link\n          href=\"https://cdn.jsdelivr.net/npm/bootstrap@5.0.0-beta3/dist/css/bootstrap.min.css\"\n          rel=\"stylesheet\"\n          integrity=\"sha384-eOJMYsd53ii+scO/bJGFsiCZc+5NDVN2yr8+0RDqr0Ql0h+rP48ckxlpbzKgwra6\"\n          crossorigin=\"anonymous\"\n        />",
-        "<script\n          src=\"https://cdn.jsdelivr.net/npm/bootstrap@5.0.0-beta3/dist/js/bootstrap.bundle.min.js\"\n          integrity=\"sha384-JEW9xMcG8R+pH31jmWH6WWP0WintQrMb4s7ZOdauHnUtxwoG2vI5DkLtS3qm9Ekf\"\n          crossorigin=\"anonymous\"\n        ></script>",
-    ]
-    for tag in bootstrap_links:
-        html = html.replace(tag, "")
+    extra_js = _EXTRA_JS_HEAD.format(
+        default_format_key=default_format_key, default_range_key=default_range_key
+    ) + _PAGE_JS
 
-    html_path.write_text(html, encoding="utf-8")
+    # All four anchors are rewritten in one scan of the page (one copy instead of four). Each
+    # occurs once in pyvis's template, so the scan stops at the last one.
+    injections = {
+        "</head>": f"{_EXTRA_HEAD}\n</head>",
+        "</style>": f"{_PAGE_CSS}\n        </style>",
+        _NETWORK_DIV: f"{controls_html}\n{_SIDEPANEL_HTML}\n{footer_html}\n{datasets_html}",
+        _NETWORK_CTOR: _NETWORK_CTOR + "\n" + extra_js,
+    }
+    return _ANCHOR_RE.sub(lambda m: injections[m.group(0)], html, count=len(injections))
+
+
+def _option_html(key: str, label: str, selected: bool) -> str:
+    return f'<option value="{key}"{" selected" if selected else ""}>{label}</option>'
+
+
+def _dumps_compact(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def write_precompressed(out_html: str, data: bytes) -> None:
+    # Sidecars for servers that serve pre-encoded files (nginx gzip_static / brotli_static,
+    # Caddy precompressed, ...) instead of compressing the multi-MB page on every request.
+    Path(out_html + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        Path(out_html + ".br").write_bytes(brotli.compress(data, quality=11))
+
+
+def write_lazy_datasets(
+    datasets_by_format: Dict[str, Dict[str, Any]],
+    out_dir: Path,
+    default_format_key: str,
+    default_range_key: str,
+) -> Dict[str, Dict[str, Any]]:
+    # Every dataset but the default one goes to its own JSON file next to the page; the embedded
+    # payload keeps a {key, label, src} stub that the page fetches the first time it is selected.
+    stubbed: Dict[str, Dict[str, Any]] = {}
+    for format_key, format_entry in datasets_by_format.items():
+        ranges: Dict[str, Dict[str, Any]] = {}
+        for range_key, payload in format_entry["ranges"].items():
+            if format_key == default_format_key and range_key == default_range_key:
+                ranges[range_key] = payload
+                continue
+            src = f"data/{format_key}/dataset_{range_key}.json"
+            path = out_dir / src
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = _dumps_compact(payload).encode("utf-8")
+            path.write_bytes(data)
+            if PRECOMPRESS_HTML:
+                write_precompressed(str(path), data)
+            ranges[range_key] = {"key": payload["key"], "label": payload["label"], "src": src}
+        stubbed[format_key] = {**format_entry, "ranges": ranges}
+    return stubbed
+
+
+def copy_local_assets(out_dir: Path) -> None:
+    # Linked mode: the page references lib/... relative to itself, so ship the assets next to it.
+    for sub in ("bindings", "tom-select", "vis-9.1.2"):
+        src = LIB_DIR / sub
+        dst = out_dir / "lib" / sub
+        if src.resolve() == dst.resolve():
+            continue
+        shutil.copytree(src, dst, dirs_exist_ok=True)
+        if PRECOMPRESS_HTML:
+            # Same pre-encoded sidecars as the page, for the (large, static) JS/CSS files.
+            for asset in dst.rglob("*"):
+                if asset.suffix in (".js", ".css"):
+                    write_precompressed(str(asset), asset.read_bytes())
+
+
+# Tag in the pyvis page -> (lib file, wrapping element) it is inlined as.
+_INLINE_TAGS: Dict[bytes, Tuple[str, bytes]] = {
+    b"<script src=\"lib/bindings/utils.js\"></script>": ("lib/bindings/utils.js", b"script"),
+    b"<link rel=\"stylesheet\" href=\"lib/vis-9.1.2/vis-network.css\" />": ("lib/vis-9.1.2/vis-network.css", b"style"),
+    b"<script src=\"lib/vis-9.1.2/vis-network.min.js\"></script>": ("lib/vis-9.1.2/vis-network.min.js", b"script"),
+    b"<link rel=\"stylesheet\" href=\"lib/tom-select/tom-select.css\" />": ("lib/tom-select/tom-select.css", b"style"),
+    b"<script src=\"lib/tom-select/tom-select.complete.min.js\"></script>": ("lib/tom-select/tom-select.complete.min.js", b"script"),
+    b"<link rel=\"stylesheet\" href=\"https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css\" integrity=\"sha512-WgxfT5LWjfszlPHXRmBWHkV2eceiWTOBvrKCNbdgDYTHrT2AeLCGbF4sZlZw3UMN3WtL0tGUoIAKsu8mllg/XA==\" crossorigin=\"anonymous\" referrerpolicy=\"no-referrer\" />": ("lib/vis-9.1.2/vis-network.css", b"style"),
+    b"<script src=\"https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js\" integrity=\"sha512-LnvoEWDFrqGHlHmDD2101OrLcbsfkrzoSpvtSQtxK3RMnRV0eOkhhBN2dXHKRrUU8p2DGRTk35n4O8nWSVe1mQ==\" crossorigin=\"anonymous\" referrerpolicy=\"no-referrer\"></script>": ("lib/vis-9.1.2/vis-network.min.js", b"script"),
+}
+# External bootstrap <link>/<script> tags, removed to make the HTML standalone. Matched loosely
+# (any attributes/whitespace) so a pyvis template change doesn't silently keep them.
+_BOOTSTRAP_TAG = rb"(?P<bootstrap><(?:link|script)\b[^>]*cdn\.jsdelivr\.net/npm/bootstrap@[^>]*>(?:\s*</script>)?)"
+_INLINE_RE = re.compile(b"|".join([_BOOTSTRAP_TAG] + [re.escape(tag) for tag in _INLINE_TAGS]))
+_INLINE_MAX_MATCHES = len(_INLINE_TAGS) + 2  # + bootstrap css and js
+
+
+@lru_cache(maxsize=None)
+def _read_asset(path: str) -> bytes:
+    # path is page-relative ("lib/..."); resolve it against LIB_DIR so the working directory doesn't matter.
+    return (LIB_DIR.parent / path).read_bytes()
+
+
+def inline_assets(html: bytes) -> bytes:
+    # Works on the encoded page so the (UTF-8) asset files are spliced in as raw bytes.
+    # One scan of the page; each asset is read (once, cached) only when its tag is present,
+    # and a file already inlined (vis-network comes via both the CDN and lib/ tags) is not repeated.
+    inlined = set()
+
+    def replace(match: re.Match) -> bytes:
+        if match.lastgroup == "bootstrap":
+            return b""
+        target = _INLINE_TAGS[match.group(0)]
+        if target in inlined:
+            return b""
+        inlined.add(target)
+        path, element = target
+        return b"<%s>\n%s\n</%s>" % (element, _read_asset(path), element)
+
+    # Every tag occurs once, all in the <head>, so only the head is scanned: the multi-MB body
+    # (datasets payload) is never searched, and a page with nothing to inline is returned as is.
+    head_end = html.find(b"</head>")
+    if head_end < 0:
+        head_end = len(html)
+    head = html[:head_end]
+
+    # Read the files the page actually references concurrently (warming _read_asset's cache).
+    paths = {_INLINE_TAGS[m.group(0)][0] for m in _INLINE_RE.finditer(head) if m.lastgroup != "bootstrap"}
+    if len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+            list(pool.map(_read_asset, paths))
+
+    new_head = _INLINE_RE.sub(replace, head, count=_INLINE_MAX_MATCHES)
+    if new_head is head:
+        return html
+    return new_head + html[head_end:]
+
+
+def strip_cdn_tags(html: bytes) -> bytes:
+    # Linked mode: pyvis's template also pulls vis-network and bootstrap from CDNs. Drop those
+    # tags (same matcher as inline_assets) so the page only loads the lib/ copies next to it.
+    def replace(match: re.Match) -> bytes:
+        tag = match.group(0)
+        if match.lastgroup == "bootstrap" or b"://" in tag:
+            return b""
+        return tag
+
+    head_end = html.find(b"</head>")
+    if head_end < 0:
+        head_end = len(html)
+    return _INLINE_RE.sub(replace, html[:head_end], count=_INLINE_MAX_MATCHES) + html[head_end:]
@@ -8,9 +8,11 @@ from urllib.parse import quote
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from config import BASE_WINRATES_URL, DEFAULT_RANGE_KEY, RANGE_OPTIONS
+from config import BASE_WINRATES_URL, DEFAULT_RANGE_KEY, FETCH_WORKERS, RANGE_OPTIONS
 
 
 RE_MATCHES = re.compile(r"([\d,]+)\s*matches", re.IGNORECASE)
@@ -24,12 +26,28 @@ HEADERS = {
     ),
     "Accept-Language": "en-US,en;q=0.9,es;q=0.8",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
     "Connection": "keep-alive",
     "Upgrade-Insecure-Requests": "1",
 }
 
 SESSION = requests.Session()
 SESSION.headers.update(HEADERS)
+# One pooled keep-alive connection per concurrent fetch; transient failures are retried.
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=max(8, FETCH_WORKERS),
+        pool_maxsize=max(8, FETCH_WORKERS),
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        ),
+    ),
+)
 
 
 @dataclass(frozen=True)
@@ -44,9 +62,9 @@ def _clean_text(s: str) -> str:
     return " ".join((s or "").replace("\xa0", " ").split()).strip()
 
 
-def parse_cell(td) -> Cell:
+def _make_cell(wr_attr: str | None, matches_text: str | None, ci_text: str | None) -> Cell:
     """
-    td expected:
+    Cell from the pieces of one td (data-winrate, matches-number and confidence-interval text):
       <td class="winrate-cell" data-winrate="53">
         <div class="data">
           <div class="confidence-interval">52% - 54%</div>
@@ -58,7 +76,6 @@ def parse_cell(td) -> Cell:
     If no data:
       <td class="winrate-cell"><div class="data"><b>--</b></div></td>
     """
-    wr_attr = td.get("data-winrate")
     if wr_attr is None:
         return Cell(winrate=None, matches=0, ci_low=None, ci_high=None)
 
@@ -68,16 +85,14 @@ def parse_cell(td) -> Cell:
         return Cell(winrate=None, matches=0, ci_low=None, ci_high=None)
 
     matches = 0
-    mn = td.find("div", class_="matches-number")
-    if mn:
-        m = RE_MATCHES.search(_clean_text(mn.get_text(" ", strip=True)))
+    if matches_text is not None:
+        m = RE_MATCHES.search(_clean_text(matches_text))
         if m:
             matches = int(m.group(1).replace(",", ""))
 
     ci_low = ci_high = None
-    ci = td.find("div", class_="confidence-interval")
-    if ci:
-        pcts = RE_PCT.findall(_clean_text(ci.get_text(" ", strip=True)))
+    if ci_text is not None:
+        pcts = RE_PCT.findall(_clean_text(ci_text))
         if len(pcts) >= 2:
             ci_low = float(pcts[0]) / 100.0
             ci_high = float(pcts[1]) / 100.0
@@ -142,29 +157,156 @@ def fetch_html(
         return None
 
 
+def _has_class(attrib, name: str) -> bool:
+    return name in (attrib.get("class") or "").split()
+
+
+class _TextCapture:
+    """Text of one element, joined like bs4's get_text(" ", strip=True)."""
+
+    __slots__ = ("depth", "parts")
+
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+        self.parts: List[str] = []
+
+    def text(self) -> str:
+        return " ".join(p for p in (part.strip() for part in self.parts) if p)
+
+
+class _WinrateTarget:
+    """
+    lxml parser target that keeps only what parse_page needs from <table id="winrates">:
+    header texts of the first <thead> and, per <tr class="item"> of the first <tbody>,
+    the row attributes, the header-cell link and each <td>'s winrate/matches/CI fields.
+    """
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.table_depth: int | None = None  # depth of the winrates table while inside it
+        self.table_seen = False
+        self.thead_state = 0  # 0 = not seen, 1 = inside, 2 = done
+        self.tbody_state = 0
+        self._thead_depth = 0
+        self._tbody_depth = 0
+        self.colnames: List[str] = []
+        self.rows: List[Dict] = []
+        self._captures: List[_TextCapture] = []
+        self._th: _TextCapture | None = None
+        self._row: Dict | None = None
+        self._tds: List[Dict] = []  # currently open <td> records of the row
+
+    def start(self, tag, attrib) -> None:
+        self.depth += 1
+        if self.table_depth is None:
+            if tag == "table" and not self.table_seen and attrib.get("id") == "winrates":
+                self.table_depth = self.depth
+                self.table_seen = True
+            return
+
+        if tag == "thead" and self.thead_state == 0:
+            self.thead_state = 1
+            self._thead_depth = self.depth
+        elif tag == "tbody" and self.tbody_state == 0:
+            self.tbody_state = 1
+            self._tbody_depth = self.depth
+        elif tag == "th" and self.thead_state == 1 and self._th is None:
+            self._th = self._capture()
+        elif tag == "tr" and self.tbody_state == 1 and self._row is None and _has_class(attrib, "item"):
+            self._row = {
+                "depth": self.depth,
+                "attrib": dict(attrib),
+                "tds": [],
+                "header_td": None,
+                "url": None,
+            }
+        elif self._row is not None:
+            self._row_start(tag, attrib)
+
+    def _row_start(self, tag, attrib) -> None:
+        row = self._row
+        if tag == "td":
+            td = {"depth": self.depth, "wr": attrib.get("data-winrate"), "mn": None, "ci": None}
+            row["tds"].append(td)
+            self._tds.append(td)
+            if row["header_td"] is None and _has_class(attrib, "header"):
+                row["header_td"] = td
+                td["first_a"] = None
+        elif tag == "a":
+            header_td = row["header_td"]
+            in_header = header_td is not None and any(td is header_td for td in self._tds)
+            if in_header and header_td["first_a"] is None:
+                header_td["first_a"] = True
+                row["url"] = attrib.get("href") or None
+        elif tag == "div":
+            for td in self._tds:
+                if td["mn"] is None and _has_class(attrib, "matches-number"):
+                    td["mn"] = self._capture()
+                if td["ci"] is None and _has_class(attrib, "confidence-interval"):
+                    td["ci"] = self._capture()
+
+    def _capture(self) -> _TextCapture:
+        cap = _TextCapture(self.depth)
+        self._captures.append(cap)
+        return cap
+
+    def data(self, text: str) -> None:
+        for cap in self._captures:
+            cap.parts.append(text)
+
+    def end(self, tag) -> None:
+        depth = self.depth
+        self.depth -= 1
+        if self.table_depth is None:
+            return
+
+        self._captures = [cap for cap in self._captures if cap.depth != depth]
+        if depth == self.table_depth:
+            self.table_depth = None
+        elif self._th is not None and depth == self._th.depth:
+            self.colnames.append(_clean_text(self._th.text()))
+            self._th = None
+        elif self.thead_state == 1 and depth == self._thead_depth:
+            self.thead_state = 2
+        elif self.tbody_state == 1 and depth == self._tbody_depth:
+            self.tbody_state = 2
+        elif self._row is not None:
+            if depth == self._row["depth"]:
+                self.rows.append(self._row)
+                self._row = None
+                self._tds = []
+            elif self._tds and depth == self._tds[-1]["depth"]:
+                self._tds.pop()
+
+    def close(self) -> "_WinrateTarget":
+        return self
+
+
+# Bump whenever parse_page can return different tables for the same HTML; it is part of
+# the name of main.py's parse memo, so pickles from an older parser are never reused.
+PARSE_CACHE_VERSION = 1
+
+
 def parse_page(html: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    soup = BeautifulSoup(html, "lxml")
+    parser = etree.HTMLParser(target=_WinrateTarget())
+    parser.feed(html)
+    page: _WinrateTarget = parser.close()
 
-    table = soup.find("table", id="winrates")
-    if not table:
+    if not page.table_seen:
         raise RuntimeError("Could not find <table id='winrates'>. Possible block/HTML change.")
 
-    thead = table.find("thead")
-    if not thead:
+    if page.thead_state == 0:
         raise RuntimeError("Could not find <thead> in winrates table.")
 
-    ths = thead.find_all("th")
-    colnames = [_clean_text(th.get_text(" ", strip=True)) for th in ths]
+    colnames = page.colnames
 
     if len(colnames) < 3 or colnames[1] != "Overall":
         raise RuntimeError(f"Unexpected headers. First ones: {colnames[:5]}")
 
-    tbody = table.find("tbody")
-    if not tbody:
+    if page.tbody_state == 0:
         raise RuntimeError("Could not find <tbody> in winrates table.")
 
-    trs = tbody.find_all("tr", class_="item")
-    if not trs:
+    if not page.rows:
         raise RuntimeError("Could not find <tr class='item'> rows.")
 
     archetype_rows: List[Dict] = []
@@ -172,29 +314,32 @@ def parse_page(html: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
 
     opponent_cols = colnames[2:]  # only top archetypes (>=2% matches per mtgdecks)
 
-    for tr in trs:
-        a_name = _clean_text(tr.get("data-name", ""))
+    def cell(td: Dict) -> Cell:
+        return _make_cell(
+            td["wr"],
+            td["mn"].text() if td["mn"] is not None else None,
+            td["ci"].text() if td["ci"] is not None else None,
+        )
+
+    for row in page.rows:
+        attrib = row["attrib"]
+        a_name = _clean_text(attrib.get("data-name", ""))
         if not a_name:
             continue
 
-        a_overall_wr = tr.get("data-winrate")
-        a_overall_matches = tr.get("data-matches")
+        a_overall_wr = attrib.get("data-winrate")
+        a_overall_matches = attrib.get("data-matches")
 
         overall_wr = float(a_overall_wr) if a_overall_wr else None
         overall_matches = int(a_overall_matches) if a_overall_matches else 0
 
-        a_url = None
-        header_td = tr.find("td", class_="header")
-        if header_td:
-            link = header_td.find("a")
-            if link and link.get("href"):
-                a_url = link["href"]
+        a_url = row["url"]
 
-        tds = tr.find_all("td")
+        tds = row["tds"]
         if len(tds) < 2:
             continue
 
-        overall_cell = parse_cell(tds[1])
+        overall_cell = cell(tds[1])
 
         archetype_rows.append(
             {
@@ -211,19 +356,19 @@ def parse_page(html: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
             td_index = 2 + j
             if td_index >= len(tds):
                 break
-            cell = parse_cell(tds[td_index])
-            if cell.winrate is None or cell.matches == 0:
+            c = cell(tds[td_index])
+            if c.winrate is None or c.matches == 0:
                 continue
 
             matchup_rows.append(
                 {
                     "a": a_name,
                     "b": b_name,
-                    "winrate_a_vs_b": cell.winrate,  # 0..1
-                    "matches": cell.matches,
-                    "ci_low": cell.ci_low,
-                    "ci_high": cell.ci_high,
+                    "winrate_a_vs_b": c.winrate,  # 0..1
+                    "matches": c.matches,
+                    "ci_low": c.ci_low,
+                    "ci_high": c.ci_high,
                 }
             )
 
-    return pd.DataFrame(archetype_rows), pd.DataFrame(matchup_rows)
+    return pd.DataFrame.from_records(archetype_rows), pd.DataFrame.from_records(matchup_rows)